@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Library of answers given on earlier application forms.
+
+Successful apply runs report every form field they filled; the answers
+are stored by normalized question text so the next form can reuse them
+instead of the agent deliberating over work authorization, disability
+or notice period questions again. Reworded questions ("Are you legally
+authorized to work in India?" vs "Are you authorised to work in India")
+are merged by fuzzy matching, but only when the words that differ are
+spelling variants: questions naming a different country, skill or number
+stay separate. The library is an append-only JSONL file
+where the latest answer for a question wins, so it can also be edited
+by hand.
+"""
+import difflib
+import json
+import os
+import re
+from datetime import datetime
+
+# Labels forms add to questions that do not change their meaning
+QUESTION_NOISE = re.compile(r"\((required|optional)\)|\brequired\b|\boptional\b|\*")
+
+# Words whose presence does not change what a question asks
+FILLER_WORDS = {
+    "a", "an", "the", "are", "is", "do", "does", "you", "your", "have",
+    "please", "currently", "legally", "of", "to",
+}
+
+# Answers longer than this are essays for one company, not reusable
+MAX_ANSWER_CHARS = 400
+
+
+def normalize_question(question: str) -> str:
+    text = QUESTION_NOISE.sub(" ", (question or "").lower())
+    # Keep + and # so C, C++ and C# stay different questions
+    text = re.sub(r"[^\w\s+#]", " ", text)
+    return " ".join(text.split())
+
+
+def same_question(key: str, other: str) -> bool:
+    """
+    Checks that two normalized questions differ only in filler words and
+    spelling variants ("authorized" / "authorised"), never in a country,
+    skill or number
+    """
+    only_key = set(key.split()) - set(other.split()) - FILLER_WORDS
+    only_other = list(set(other.split()) - set(key.split()) - FILLER_WORDS)
+    if len(only_key) != len(only_other):
+        return False
+    for token in only_key:
+        if any(char.isdigit() for char in token):
+            return False
+        variants = difflib.get_close_matches(token, only_other, n=1, cutoff=0.8)
+        if not variants:
+            return False
+        only_other.remove(variants[0])
+    return True
+
+
+class AnswerLibrary:
+    """
+    Answers keyed by normalized question, persisted as JSONL.
+    """
+
+    def __init__(self, library_file: str = "form_answers.jsonl", cutoff: float = 0.85):
+        self.library_file = library_file
+        self.cutoff = cutoff
+        # key -> {"question", "answer", "count", "updated_at"}
+        self.answers = {}
+
+        if os.path.exists(library_file):
+            with open(library_file, "r") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Skip a line cut off by a crash
+                        continue
+                    self._add(entry)
+
+    def _add(self, entry: dict):
+        # Hand-written lines may leave out the key
+        key = entry.get("key") or normalize_question(entry.get("question"))
+        if not key or not entry.get("answer"):
+            return
+        previous = self.answers.get(key)
+        self.answers[key] = {
+            "question": entry["question"],
+            "answer": entry["answer"],
+            "count": (previous["count"] if previous else 0) + 1,
+            "updated_at": entry.get("updated_at"),
+        }
+
+    def match(self, question: str):
+        """
+        Returns the library key for a question, matching reworded
+        questions fuzzily, or None if it has not been answered before
+        """
+        key = normalize_question(question)
+        if key in self.answers:
+            return key
+        matches = difflib.get_close_matches(key, self.answers, n=5, cutoff=self.cutoff)
+        return next((match for match in matches if same_question(key, match)), None)
+
+    def record(self, fields: list, company_name: str = None) -> int:
+        """
+        Stores the question/answer pairs of a successfully filled form
+
+        Args:
+            fields: List of {"question", "answer"} dicts
+            company_name: Questions naming the company are specific to
+                this job and are not kept
+
+        Returns:
+            Number of answers stored
+        """
+        company = normalize_question(company_name)
+        entries = []
+        for field in fields:
+            question = " ".join(str(field.get("question") or "").split())
+            answer = " ".join(str(field.get("answer") or "").split())
+            key = normalize_question(question)
+            if not key or not answer or len(answer) > MAX_ANSWER_CHARS:
+                continue
+            if company and company in key:
+                continue
+            entries.append(
+                {
+                    "key": self.match(question) or key,
+                    "question": question,
+                    "answer": answer,
+                    "updated_at": datetime.now().isoformat(timespec="seconds"),
+                }
+            )
+
+        if not entries:
+            return 0
+        directory = os.path.dirname(self.library_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.library_file, "a") as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + "\n")
+                self._add(entry)
+        return len(entries)
+
+    def prompt_text(self, limit: int = 40) -> str:
+        """
+        Lists the most often used answers as "question: answer" lines
+        """
+        ranked = sorted(self.answers.values(), key=lambda item: item["count"], reverse=True)
+        return "\n".join(f"- {item['question']}: {item['answer']}" for item in ranked[:limit])
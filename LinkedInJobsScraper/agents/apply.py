@@ -1,37 +1,86 @@
 #!/usr/bin/env python3
 # from argparse import Action
 import asyncio
-from droidrun import DroidAgent
+from typing import List
+from pydantic import BaseModel, Field
+from droidrun import AdbTools, DroidAgent
 from droidrun.config_manager.config_manager import (
     DroidrunConfig,
     TracingConfig,
     LoggingConfig,
     AgentConfig,
+    DeviceConfig,
 )
-from llama_index.llms.google_genai import GoogleGenAI
+from agents.answer_library import AnswerLibrary
+from agents.llm_pool import get_llm
+from agents.profile_cache import get_candidate_profile, get_job_context
 from agents.prompts import prompts
+from agents.retry import raise_if_permanent
 from dotenv import load_dotenv
-import os
-import json
 
 load_dotenv()
 
 
+class FormField(BaseModel):
+    question: str = Field(description="Question or label of the form field")
+    answer: str = Field(description="Answer filled in or option selected")
+
+
+class ApplicationForm(BaseModel):
+    fields: List[FormField] = Field(description="Every form field filled, in order")
+
+
+_answer_library = None
+
+
+def get_answer_library() -> AnswerLibrary:
+    """
+    Returns the shared library of answers from earlier applications
+    """
+    global _answer_library
+    if _answer_library is None:
+        _answer_library = AnswerLibrary()
+    return _answer_library
+
+
 async def apply_to_job(
-    job_data_file: str, candidate_data_file: str, phone_resume_location: str
+    job_data_file: str,
+    candidate_data_file: str,
+    phone_resume_location: str,
+    serial: str = None,
+    open_job: bool = False,
 ):
-    with open(job_data_file, "r") as f:
-        company_data = json.load(f)
-    with open(candidate_data_file, "r") as f:
-        candidate_data = json.load(f)
-
-    # Use default configuration with built-in LLM profiles
-    llm = GoogleGenAI(
-        api_key=os.environ["GEMINI_API_KEY"],
-        model="gemini-2.5-pro",
+    """
+    Fills the job's application form for the candidate.
+    With open_job, the agent first opens the job page itself (batch mode).
+    """
+    # Parsed once and reused by retries and the other jobs in a batch
+    job = get_job_context(job_data_file)
+    candidate = get_candidate_profile(candidate_data_file)
+    company_data = job.data
+    answer_library = get_answer_library()
+
+    goal = prompts.APPLY_GOAL(
+        job_context=job.prompt_text,
+        candidate_context=candidate.prompt_text,
+        resume_path=phone_resume_location,
+        known_answers=answer_library.prompt_text(),
     )
+    if open_job:
+        goal = (
+            prompts.OPEN_JOB_GOAL(
+                company_name=company_data["company_name"],
+                job_title=company_data["job_title"],
+                location=company_data.get("location", ""),
+            )
+            + goal
+        )
+
+    # Reuse the shared LLM client
+    llm = get_llm(model="gemini-2.5-pro")
     config = DroidrunConfig(
-        agent=AgentConfig(reasoning=True, max_steps=50),
+        agent=AgentConfig(reasoning=True, max_steps=60 if open_job else 50),
+        device=DeviceConfig(serial=serial),
         tracing=TracingConfig(enabled=False),
         logging=LoggingConfig(debug=True, save_trajectory="action"),
     )
@@ -39,13 +88,11 @@ async def apply_to_job(
     # Create agent
     # LLMs can also be automatically loaded from config.llm_profiles
     agent = DroidAgent(
-        goal=prompts.APPLY_GOAL(
-            company_data=company_data,
-            candidate_data=candidate_data,
-            resume_path=phone_resume_location,
-        ),
+        goal=goal,
         config=config,
         llms=llm,
+        tools=AdbTools(serial=serial),
+        output_model=ApplicationForm,
     )
 
     # Run agent
@@ -58,6 +105,15 @@ async def apply_to_job(
     if result.output:
         print(f"Output: {result.output}")
 
+    if not result.success:
+        # e.g. the job needs a login on an external site
+        raise_if_permanent(result.reason)
+    elif isinstance(result.output, ApplicationForm):
+        stored = answer_library.record(
+            [field.dict() for field in result.output.fields],
+            company_name=company_data.get("company_name"),
+        )
+        print(f"Stored {stored} answers for future applications")
     return result.success
 
 
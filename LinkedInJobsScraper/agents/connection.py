@@ -1,35 +1,50 @@
 #!/usr/bin/env python3
 # from argparse import Action
 import asyncio
-from droidrun import DroidAgent
+from droidrun import AdbTools, DroidAgent
 from droidrun.config_manager.config_manager import (
     DroidrunConfig,
     TracingConfig,
     LoggingConfig,
     AgentConfig,
+    DeviceConfig,
 )
-from llama_index.llms.google_genai import GoogleGenAI
+from agents.llm_pool import get_llm
+from agents.profile_cache import get_job_context
 from agents.prompts import prompts
+from agents.retry import raise_if_permanent
 from dotenv import load_dotenv
-import os
-import json
 
 load_dotenv()
 
 
-async def send_connection_requests(job_data_file: str):
-    with open(job_data_file, "r") as f:
-        company_data = json.load(f)
+async def send_connection_requests(
+    job_data_file: str, serial: str = None, open_job: bool = False
+):
+    """
+    Sends connection requests to people at the job's company.
+    With open_job, the agent first opens the job page itself (batch mode,
+    where the device is not left on the job page by the search).
+    """
+    company_data = get_job_context(job_data_file).data
 
     company_name = company_data["company_name"]
+    goal = prompts.SEND_CONNECTION_REQUESTS_GOAL(company_name=company_name)
+    if open_job:
+        goal = (
+            prompts.OPEN_JOB_GOAL(
+                company_name=company_name,
+                job_title=company_data["job_title"],
+                location=company_data.get("location", ""),
+            )
+            + goal
+        )
 
-    # Use default configuration with built-in LLM profiles
-    llm = GoogleGenAI(
-        api_key=os.environ["GEMINI_API_KEY"],
-        model="gemini-2.5-pro",
-    )
+    # Reuse the shared LLM client
+    llm = get_llm(model="gemini-2.5-pro")
     config = DroidrunConfig(
-        agent=AgentConfig(reasoning=True, max_steps=25),
+        agent=AgentConfig(reasoning=True, max_steps=35 if open_job else 25),
+        device=DeviceConfig(serial=serial),
         tracing=TracingConfig(enabled=False),
         logging=LoggingConfig(debug=True, save_trajectory="action"),
     )
@@ -37,9 +52,10 @@ async def send_connection_requests(job_data_file: str):
     # Create agent
     # LLMs can also be automatically loaded from config.llm_profiles
     agent = DroidAgent(
-        goal=prompts.SEND_CONNECTION_REQUESTS_GOAL(company_name=company_name),
+        goal=goal,
         config=config,
         llms=llm,
+        tools=AdbTools(serial=serial),
     )
 
     # Run agent
@@ -52,6 +68,9 @@ async def send_connection_requests(job_data_file: str):
     if result.output:
         print(f"Output: {result.output}")
 
+    if not result.success:
+        # e.g. the job needs a login on an external site
+        raise_if_permanent(result.reason)
     return result.success
 
 
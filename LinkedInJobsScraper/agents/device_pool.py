@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+ADB device pool for JobDroid.
+
+Shards a list of agent tasks across every connected Android device (or
+emulator), running one worker per device and collecting results in
+task order.
+"""
+import asyncio
+
+
+async def list_devices() -> list:
+    """
+    Returns the serials of all devices reported as ready by `adb devices`
+    """
+    try:
+        process = await asyncio.create_subprocess_exec(
+            "adb",
+            "devices",
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+        stdout, _ = await process.communicate()
+    except FileNotFoundError:
+        print("adb not found on PATH, falling back to the default device")
+        return []
+
+    serials = []
+    for line in stdout.decode().splitlines()[1:]:
+        parts = line.split()
+        if len(parts) >= 2 and parts[1] == "device":
+            serials.append(parts[0])
+    return serials
+
+
+class DevicePool:
+    """
+    Runs tasks across a pool of devices.
+
+    Every device gets one worker pulling from a shared queue, so faster
+    devices naturally pick up more work.
+    """
+
+    def __init__(self, serials: list):
+        # A None serial lets droidrun pick the only connected device
+        self.serials = list(serials) or [None]
+
+    def __len__(self):
+        return len(self.serials)
+
+    async def map(self, handler, tasks: list) -> list:
+        """
+        Runs ``handler(task, serial)`` for every task and returns the results
+        in the same order as ``tasks``. Exceptions raised by the handler are
+        returned in place of a result.
+
+        Args:
+            handler: Coroutine function taking a task and a device serial
+            tasks: List of tasks to distribute
+        """
+        queue = asyncio.Queue()
+        for index, task in enumerate(tasks):
+            queue.put_nowait((index, task))
+
+        results = [None] * len(tasks)
+
+        async def worker(serial):
+            while True:
+                try:
+                    index, task = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    results[index] = await handler(task, serial)
+                except Exception as e:
+                    results[index] = e
+
+        await asyncio.gather(*(worker(serial) for serial in self.serials))
+        return results
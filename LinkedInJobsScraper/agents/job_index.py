@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Index of jobs JobDroid has already picked up.
+
+Each job is keyed by a hash of its normalized company, title, location
+and posting date. Jobs are recorded as found when the search saves them
+and as processed once their connect and apply stages are finished;
+find_job tells the search agent to skip processed listings and drops
+any it returns anyway, while found-only jobs (an apply that failed, a
+batch that was interrupted) come up again. LinkedIn shows relative dates
+("6 hours ago"), which are turned into calendar dates first. Coarse units
+keep showing the same text for days ("2 weeks ago"), so lookups accept
+any date within one unit of the stored one: a day for hours and days, a
+week for weeks, a month for months.
+"""
+import hashlib
+import json
+import os
+import re
+from datetime import date, datetime, timedelta
+
+FOUND = "found"
+PROCESSED = "processed"
+
+RELATIVE_UNITS = {
+    "minute": timedelta(minutes=1),
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+    "week": timedelta(weeks=1),
+    "month": timedelta(days=30),
+    "year": timedelta(days=365),
+}
+
+
+def normalize_text(text: str) -> str:
+    text = re.sub(r"[^\w\s]", " ", (text or "").lower())
+    return " ".join(text.split())
+
+
+def _relative_date(date_posted: str):
+    text = (date_posted or "").lower()
+    if "just now" in text or "today" in text:
+        return 0, "day"
+    if "yesterday" in text:
+        return 1, "day"
+    match = re.search(r"(\d+)\s*(minute|hour|day|week|month|year)s?\b", text)
+    if not match:
+        return None
+    return int(match.group(1)), match.group(2)
+
+
+def posted_date(date_posted: str, now: datetime = None):
+    """
+    Converts LinkedIn's "6 hours ago" / "Reposted 2 weeks ago" to a date,
+    or returns None if the text is not a relative date
+    """
+    relative = _relative_date(date_posted)
+    if relative is None:
+        return None
+    count, unit = relative
+    return ((now or datetime.now()) - count * RELATIVE_UNITS[unit]).date()
+
+
+def date_tolerance(date_posted: str) -> timedelta:
+    """
+    Returns how far a date read from a relative date may be off: LinkedIn
+    rounds to the unit it shows, and at least a day
+    """
+    relative = _relative_date(date_posted)
+    if relative is None:
+        return timedelta(0)
+    return max(RELATIVE_UNITS[relative[1]], timedelta(days=1))
+
+
+def listing_key(job: dict) -> str:
+    """
+    Hashes a job by normalized company, title and location only
+    """
+    parts = [
+        normalize_text(job.get("company_name")),
+        normalize_text(job.get("job_title")),
+        normalize_text(job.get("location")),
+    ]
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+def job_key(job: dict, posted: date = None) -> str:
+    """
+    Hashes a job by normalized company, title, location and posting date
+    """
+    posted = posted or posted_date(job.get("date_posted"))
+    parts = [
+        normalize_text(job.get("company_name")),
+        normalize_text(job.get("job_title")),
+        normalize_text(job.get("location")),
+        posted.isoformat() if posted else normalize_text(job.get("date_posted")),
+    ]
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+class JobIndex:
+    """
+    Job keys and their latest status, persisted as an append-only JSONL
+    file where later lines win.
+    """
+
+    def __init__(self, index_file: str = "jobs/job_index.jsonl"):
+        self.index_file = index_file
+        # key -> latest entry
+        self.entries = {}
+        # listing key -> [(posted date, tolerance, key)] of dated entries
+        self.listings = {}
+
+        if os.path.exists(index_file):
+            with open(index_file, "r") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Skip a line cut off by a crash
+                        continue
+                    # Entries from before statuses were tracked
+                    entry.setdefault("status", PROCESSED)
+                    self._add(entry)
+
+    def _add(self, entry: dict):
+        if entry["key"] not in self.entries:
+            # Relative dates are resolved against when the entry was written
+            try:
+                seen_at = datetime.fromisoformat(entry.get("seen_at") or "")
+            except ValueError:
+                seen_at = None
+            posted = posted_date(entry.get("date_posted"), seen_at)
+            if posted is not None:
+                self.listings.setdefault(listing_key(entry), []).append(
+                    (posted, date_tolerance(entry.get("date_posted")), entry["key"])
+                )
+        self.entries.pop(entry["key"], None)
+        self.entries[entry["key"]] = entry
+
+    def find_key(self, job: dict):
+        """
+        Returns the key a job is indexed under, or None if it is unknown
+        """
+        key = job_key(job)
+        if key in self.entries:
+            return key
+        posted = posted_date(job.get("date_posted"))
+        if posted is None:
+            return None
+        tolerance = date_tolerance(job.get("date_posted"))
+        for other_posted, other_tolerance, other_key in self.listings.get(listing_key(job), []):
+            if abs(posted - other_posted) <= max(tolerance, other_tolerance):
+                return other_key
+        return None
+
+    def has_job(self, job: dict) -> bool:
+        """
+        Checks whether a job was already processed
+        """
+        key = self.find_key(job)
+        return key is not None and self.entries[key]["status"] == PROCESSED
+
+    def add_job(self, job: dict, job_file: str = None, status: str = FOUND) -> bool:
+        """
+        Records a job with a status, returning False if it was already
+        processed
+        """
+        if self.has_job(job):
+            return False
+
+        entry = {
+            "key": self.find_key(job) or job_key(job),
+            "status": status,
+            "company_name": job.get("company_name"),
+            "job_title": job.get("job_title"),
+            "location": job.get("location"),
+            "date_posted": job.get("date_posted"),
+            "file": job_file,
+            "seen_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        directory = os.path.dirname(self.index_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.index_file, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+
+        self._add(entry)
+        return True
+
+    def mark_processed(self, job: dict, job_file: str = None) -> bool:
+        """
+        Marks a job as done once its stages have finished
+        """
+        return self.add_job(job, job_file, status=PROCESSED)
+
+    def recent_jobs(self, limit: int = 50) -> list:
+        """
+        Returns the most recently processed jobs, for telling the agent what to skip
+        """
+        processed = [entry for entry in self.entries.values() if entry["status"] == PROCESSED]
+        return processed[-limit:]
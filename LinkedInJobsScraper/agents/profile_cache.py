@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Cached candidate profile and job data for the apply and connection agents.
+
+The candidate profile and every job file are parsed once and turned into
+a compact plain-text prompt context, which is reused by retries and by
+the other jobs in a batch. A file is reloaded only when its modification
+time changes, so edits to candidate_data.json between cycles still apply.
+"""
+import json
+import os
+from dataclasses import dataclass
+
+# The form agent only needs the gist of a long job description
+JOB_DESCRIPTION_CHARS = 2500
+
+# Job fields that do not help fill an application form
+JOB_PROMPT_SKIP = {"date_posted"}
+
+
+@dataclass
+class PromptContext:
+    data: dict
+    prompt_text: str
+
+
+_cache = {}
+
+
+def compact_text(value, prefix: str = "") -> str:
+    """
+    Flattens JSON data into "key: value" lines, which take far fewer
+    tokens than a dict repr with its quotes, braces and escapes
+    """
+    if isinstance(value, dict):
+        return "\n".join(
+            compact_text(item, f"{prefix}{key}." if prefix else f"{key}.")
+            for key, item in value.items()
+            if item not in (None, "", [], {})
+        )
+    label = prefix.rstrip(".")
+    if isinstance(value, list):
+        items = "\n".join(f"- {' '.join(str(item).split())}" for item in value)
+        return f"{label}:\n{items}"
+    return f"{label}: {' '.join(str(value).split())}"
+
+
+def _job_prompt_text(job_data: dict) -> str:
+    job_data = {
+        key: value for key, value in job_data.items() if key not in JOB_PROMPT_SKIP
+    }
+    description = " ".join(str(job_data.get("job_description") or "").split())
+    if len(description) > JOB_DESCRIPTION_CHARS:
+        # Cut at a sentence boundary where possible
+        cut = description[:JOB_DESCRIPTION_CHARS]
+        sentence_end = max(cut.rfind(". "), cut.rfind("! "), cut.rfind("? "))
+        description = cut[: sentence_end + 1] if sentence_end > 0 else cut + "..."
+    if description:
+        job_data["job_description"] = description
+    return compact_text(job_data)
+
+
+def _load(path: str, build) -> PromptContext:
+    mtime = os.stat(path).st_mtime_ns
+    cached = _cache.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    with open(path, "r") as f:
+        data = json.load(f)
+    context = PromptContext(data=data, prompt_text=build(data))
+    _cache[path] = (mtime, context)
+    return context
+
+
+def get_candidate_profile(candidate_data_file: str = "candidate_data.json") -> PromptContext:
+    """
+    Returns the candidate profile, reloading it if the file changed
+    """
+    return _load(candidate_data_file, compact_text)
+
+
+def get_job_context(job_data_file: str) -> PromptContext:
+    """
+    Returns a job's data and its compact prompt text, reloading it if the
+    file changed
+    """
+    return _load(job_data_file, _job_prompt_text)
+
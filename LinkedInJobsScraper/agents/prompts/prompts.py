@@ -1,10 +1,26 @@
-def SEARCH_JOBS_GOAL():
+def SKIP_JOBS(skip_jobs: list):
+    """
+    Lists already processed jobs the search agents should pass over
+    """
+    if not skip_jobs:
+        return ""
+    lines = "\n".join(
+        f"- {job.get('job_title')} at {job.get('company_name')} ({job.get('location')})"
+        for job in skip_jobs
+    )
+    return f"""
+Already processed jobs (treat them like promoted jobs and skip them, moving on to the next job in the list):
+{lines}
+"""
+
+
+def SEARCH_JOBS_GOAL(skip_jobs: list = None):
     prompt = """
 1. Open Linkedin using package name com.linkedin.android 
 2. Go to jobs section.
 3. Click "Show all" in the "Top Job picks for you" section (this section is present on top of the page, do not scroll).
 4. Goto IT tab.
-5. Open first job which is not promoted (does not contain "Promoted" below it).
+5. Open first job which is not promoted (does not contain "Promoted" below it) and not in the already processed jobs listed below.
 6. Click on "show more" in About the job section to expand the full job description.
 7. return the following details in json format as output:
 {
@@ -16,11 +32,50 @@ def SEARCH_JOBS_GOAL():
 }
 
 Output only the JSON string, do not include any other text.
-"""
+""" + SKIP_JOBS(skip_jobs)
     # print(prompt)
     return prompt
 
 
+def SEARCH_JOBS_BATCH_GOAL(max_jobs: int, skip_jobs: list = None):
+    prompt = f"""
+1. Open Linkedin using package name com.linkedin.android 
+2. Go to jobs section.
+3. Click "Show all" in the "Top Job picks for you" section (this section is present on top of the page, do not scroll).
+4. Goto IT tab.
+5. Go through the jobs from the top of the list, skipping every job which is promoted (contains "Promoted" below it) or already processed (listed below), until you have collected {max_jobs} jobs or reached the end of the list. For each job:
+   - Open the job.
+   - Click on "show more" in About the job section to expand the full job description.
+   - Note down the details below, then press back to return to the job list.
+6. return the details of all collected jobs in json format as output:
+{{
+  "jobs": [
+    {{
+      "job_title": "string",
+      "company_name": "string",
+      "location": "string",
+      "date_posted": "string",
+      "job_description": "string"
+    }}
+  ]
+}}
+
+Output only the JSON string, do not include any other text.
+""" + SKIP_JOBS(skip_jobs)
+    # print(prompt)
+    return prompt
+
+
+def OPEN_JOB_GOAL(company_name: str, job_title: str, location: str):
+    return f"""
+0. Open the job page first:
+   - Open Linkedin using package name com.linkedin.android and go to jobs section.
+   - Search jobs for "{job_title} {company_name}".
+   - Open the "{job_title}" job posted by {company_name} (location: {location}).
+Then continue with the steps below on that job page.
+"""
+
+
 def APPLY(
     company_name: str,
     job_title: str,
@@ -51,7 +106,9 @@ After all connection requests are sent, return back to the {company_name}'s job
 """
 
 
-def APPLY_GOAL(company_data: dict, candidate_data: dict, resume_path: str):
+def APPLY_GOAL(
+    job_context: str, candidate_context: str, resume_path: str, known_answers: str = ""
+):
     prompt = f"""
 You are a job applying agent. You have all information about the company and the candidate who is applying. You have to fill the job application form for the candidate.
 1. Click on Apply from screen to open application website.
@@ -59,13 +116,20 @@ You are a job applying agent. You have all information about the company and the
 3. Fill the form according to company and candidate information given below. Fill the information not given yourself to something common and generic (like no disability, allowed to work at the location, no military experience). Fill best responses to subjective questions withing 200 words if needed. The resume is stored in the device at {resume_path}, select it from there for uploading. No need to apply, just fill all the fields and upload resume through upload button. Make sure to fill all fields even after scrolling
 
 candidate information:
-{candidate_data}
+{candidate_context}
 
 
 company information:
-{company_data}
+{job_context}
 
 (In case the input field is dropdown and you can't find relevant option, select "other")
+
+When done, output every field you filled with its question or label and the answer you gave.
+"""
+    if known_answers:
+        prompt += f"""
+Answers given in earlier applications. When a field asks the same question, fill in this answer directly without deliberating:
+{known_answers}
 """
     # print(prompt)
     return prompt
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Retry policy and circuit breakers for JobDroid's agent stages.
+
+Failures are classified as transient (device glitches, LLM timeouts and
+rate limits) or permanent (a job that needs an external login, a closed
+posting, a broken job file). Transient failures are retried with
+exponential backoff and jitter; permanent ones stop at once. Each stage
+also has a circuit breaker that pauses it after repeated transient
+failures in a row; a logged out LinkedIn session opens every breaker at
+once, while job-specific failures never count against it.
+"""
+import asyncio
+import json
+import random
+import re
+import time
+
+# Failure reasons showing the LinkedIn session itself is logged out,
+# which stops every job on the account
+SESSION_LOGGED_OUT_PATTERNS = [
+    r"linkedin\b.{0,40}\b(log(ged)?|sign(ed)?)[ -]?(in|out)\b",
+    r"\b(log(ged)?|sign(ed)?)[ -]?(in|out)\b.{0,20}\blinkedin\b",
+    r"\b(logged|signed) out\b",
+    r"session (has )?expired",
+    r"join linkedin",
+]
+
+# Failure reasons pointing at an application site outside LinkedIn;
+# a login mentioned alongside them is that site's, not LinkedIn's
+EXTERNAL_SITE_PATTERNS = [
+    r"external (site|website|page|portal)",
+    r"company('s)? (careers? )?(site|website|page|portal)",
+    r"careers? (site|page|portal)",
+    r"redirect",
+    r"\b(workday|greenhouse|lever|taleo|icims|smartrecruiters)\b",
+]
+
+# Failure reasons specific to one job, e.g. an application site that
+# needs its own account
+JOB_UNAVAILABLE_PATTERNS = EXTERNAL_SITE_PATTERNS + [
+    r"\blog(ging)?[ -]?in\b",
+    r"\bsign(ing)?[ -]?in\b",
+    r"no longer (accepting|available)",
+    r"already applied",
+]
+
+PERMANENT_REASON_PATTERNS = SESSION_LOGGED_OUT_PATTERNS + JOB_UNAVAILABLE_PATTERNS
+
+# Exception messages that point at a passing device or LLM problem
+TRANSIENT_MESSAGE_PATTERNS = [
+    r"time(d)? ?out",
+    r"deadline",
+    r"\b429\b",
+    r"\b50[234]\b",
+    r"rate[ _-]?limit",
+    r"resource[ _-]?exhausted",
+    r"unavailable",
+    r"overloaded",
+    r"connection (reset|refused|aborted)",
+    r"device (offline|not found)",
+]
+
+TRANSIENT_ERRORS = (asyncio.TimeoutError, TimeoutError, ConnectionError)
+
+
+class PermanentError(Exception):
+    """
+    A stage failure that retrying cannot fix.
+    """
+
+
+class JobUnavailable(PermanentError):
+    """
+    The job cannot be processed, e.g. it needs an external login or is
+    closed; other jobs are unaffected.
+    """
+
+
+class SessionLoggedOut(PermanentError):
+    """
+    LinkedIn logged the account out; no job can succeed until it signs
+    in again.
+    """
+
+
+def _matches(patterns: list, text: str) -> bool:
+    return any(re.search(pattern, text) for pattern in patterns)
+
+
+def permanent_reason(reason: str) -> bool:
+    return _matches(PERMANENT_REASON_PATTERNS, (reason or "").lower())
+
+
+def raise_if_permanent(reason: str):
+    """
+    Raises SessionLoggedOut or JobUnavailable if an agent's failure
+    reason is not worth retrying
+    """
+    text = (reason or "").lower()
+    if not _matches(EXTERNAL_SITE_PATTERNS, text) and _matches(
+        SESSION_LOGGED_OUT_PATTERNS, text
+    ):
+        raise SessionLoggedOut(reason)
+    if _matches(JOB_UNAVAILABLE_PATTERNS, text):
+        raise JobUnavailable(reason)
+
+
+def is_transient(error: Exception) -> bool:
+    """
+    Classifies an exception raised by a stage. Unknown errors count as
+    transient, so they still get the (bounded) retries they used to.
+    """
+    if isinstance(error, PermanentError):
+        return False
+    if isinstance(error, TRANSIENT_ERRORS):
+        return True
+    # A missing or malformed job file fails the same way every time
+    if isinstance(error, (FileNotFoundError, KeyError, json.JSONDecodeError)):
+        return False
+    text = str(error).lower()
+    if _matches(TRANSIENT_MESSAGE_PATTERNS, text):
+        return True
+    return not permanent_reason(text)
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with jitter for one stage.
+
+    Args:
+        max_attempts: Attempts per job, including the first
+        base_delay: Seconds to wait before the first retry
+        max_delay: Upper bound on the wait between attempts
+        jitter: Fraction of the delay randomized either way, so devices
+            retrying together do not hit LinkedIn and the LLM in lockstep
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 5.0,
+        max_delay: float = 60.0,
+        jitter: float = 0.3,
+    ):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+
+    def delay(self, attempt: int) -> float:
+        """
+        Seconds to wait before ``attempt`` (1 for the first retry)
+        """
+        delay = self.base_delay * 2 ** (attempt - 1)
+        delay *= random.uniform(1 - self.jitter, 1 + self.jitter)
+        return min(self.max_delay, delay)
+
+
+class CircuitBreaker:
+    """
+    Pauses a stage after ``failure_threshold`` transient failures in a row.
+
+    Once ``reset_timeout`` seconds have passed a single trial attempt is
+    let through; a success closes the breaker, a failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 600.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None and self.retry_after() > 0
+
+    def retry_after(self) -> float:
+        """
+        Seconds until the breaker lets a trial attempt through
+        """
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
+
+    def allow(self) -> bool:
+        if self.opened_at is None:
+            return True
+        if self.retry_after() > 0:
+            return False
+        # Half open: one more failure reopens the breaker
+        self.opened_at = None
+        self.failures = self.failure_threshold - 1
+        return True
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+
+    def trip(self):
+        """
+        Opens the breaker straight away
+        """
+        self.failures = max(self.failures, self.failure_threshold)
+        self.opened_at = time.monotonic()
+
+    def record_failure(self):
+        self.failures += 1
+        if self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
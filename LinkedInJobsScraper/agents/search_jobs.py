@@ -1,14 +1,18 @@
 import asyncio
+from typing import List
 from pydantic import BaseModel, Field
 
-from droidrun import DroidAgent
+from droidrun import AdbTools, DroidAgent
 from droidrun.config_manager.config_manager import (
     DroidrunConfig,
     TracingConfig,
     LoggingConfig,
     AgentConfig,
+    DeviceConfig,
 )
-from llama_index.llms.google_genai import GoogleGenAI
+from agents.llm_pool import get_llm
+from agents.job_index import JobIndex, job_key
+from agents.retry import raise_if_permanent
 
 from agents.prompts import prompts
 
@@ -25,12 +29,51 @@ class JobData(BaseModel):
     date_posted: str = Field(description="Date when the job was posted")
 
 
-async def find_job():
-    # Use default configuration with built-in LLM profiles
-    llm = GoogleGenAI(
-        api_key=os.environ["GEMINI_API_KEY"],
-        model="gemini-2.5-pro",
+# Most recently seen jobs listed in the search prompt
+SKIP_JOBS_LIMIT = 50
+
+_job_index = None
+
+
+def get_job_index() -> JobIndex:
+    """
+    Returns the shared index of found and processed jobs
+    """
+    global _job_index
+    if _job_index is None:
+        _job_index = JobIndex()
+    return _job_index
+
+
+class JobList(BaseModel):
+    jobs: List[JobData] = Field(description="Non-promoted jobs in list order")
+
+
+def save_job(job_data: JobData, output_directory: str = "jobs/") -> str:
+    """
+    Saves a job to jobs/<Company>_<Title>.json and returns the file path
+    """
+    os.makedirs(output_directory, exist_ok=True)
+    job_title = (
+        job_data.company_name.replace(" ", "_")
+        + "_"
+        + job_data.job_title.replace(" ", "_")
     )
+    file_path = os.path.join(output_directory, f"{job_title}.json")
+    with open(file_path, "w") as f:
+        f.write(job_data.json(indent=4))
+    print(f"Job data saved to {file_path}")
+    return file_path
+
+
+async def find_job():
+    """
+    Finds the first new job, skipping ones processed in earlier cycles,
+    and returns its saved file path or None
+    """
+    job_index = get_job_index()
+    # Reuse the shared LLM client
+    llm = get_llm(model="gemini-2.5-pro")
     config = DroidrunConfig(
         agent=AgentConfig(reasoning=True),
         tracing=TracingConfig(enabled=False),
@@ -39,7 +82,9 @@ async def find_job():
     # Create agent
     # LLMs can also be automatically loaded from config.llm_profiles
     agent = DroidAgent(
-        goal=prompts.SEARCH_JOBS_GOAL(),
+        goal=prompts.SEARCH_JOBS_GOAL(
+            skip_jobs=job_index.recent_jobs(SKIP_JOBS_LIMIT)
+        ),
         config=config,
         llms=llm,
         output_model=JobData,
@@ -56,23 +101,81 @@ async def find_job():
     if result.success:
         job_data: JobData = result.output
         print(f"Job Data: {job_data.json(indent=4)}")
-
-        output_directory = "jobs/"
-        os.makedirs(output_directory, exist_ok=True)
-        job_title = (
-            job_data.company_name.replace(" ", "_")
-            + "_"
-            + job_data.job_title.replace(" ", "_")
-        )
-        file_path = os.path.join(output_directory, f"{job_title}.json")
-        with open(file_path, "w") as f:
-            f.write(job_data.json(indent=4))
-        print(f"Job data saved to {file_path}")
-
+        if job_index.has_job(job_data.dict()):
+            print("Job was already processed in an earlier cycle, skipping it")
+            return None
+        file_path = save_job(job_data)
+        job_index.add_job(job_data.dict(), file_path)
         return file_path
     else:
+        raise_if_permanent(result.reason)
         return None
 
 
+async def find_jobs(max_jobs: int = 10, serial: str = None) -> list:
+    """
+    Collects the top non-promoted jobs in a single agent session,
+    skipping jobs processed in earlier cycles.
+
+    Args:
+        max_jobs: Number of jobs to collect
+        serial: Device to search on (defaults to the only connected device)
+
+    Returns:
+        List of saved job file paths
+    """
+    job_index = get_job_index()
+    # Reuse the shared LLM client
+    llm = get_llm(model="gemini-2.5-pro")
+    config = DroidrunConfig(
+        # Every job takes a few steps to open, expand and leave
+        agent=AgentConfig(reasoning=True, max_steps=15 + 8 * max_jobs),
+        device=DeviceConfig(serial=serial),
+        tracing=TracingConfig(enabled=False),
+        logging=LoggingConfig(debug=True, save_trajectory="action"),
+    )
+    agent = DroidAgent(
+        goal=prompts.SEARCH_JOBS_BATCH_GOAL(
+            max_jobs=max_jobs, skip_jobs=job_index.recent_jobs(SKIP_JOBS_LIMIT)
+        ),
+        config=config,
+        llms=llm,
+        tools=AdbTools(serial=serial),
+        output_model=JobList,
+    )
+
+    # Run agent
+    result = await agent.run()
+
+    # Check results (result is a ResultEvent object)
+    print(f"Success: {result.success}")
+    print(f"Reason: {result.reason}")
+    print(f"Steps: {result.steps}")
+
+    if not result.success:
+        raise_if_permanent(result.reason)
+    if not result.success or not result.output:
+        return []
+
+    job_list: JobList = result.output
+    print(f"Found {len(job_list.jobs)} jobs")
+
+    job_files = []
+    batch_keys = set()
+    for job_data in job_list.jobs:
+        key = job_key(job_data.dict())
+        if len(job_files) >= max_jobs or key in batch_keys:
+            continue
+        if job_index.has_job(job_data.dict()):
+            continue
+        batch_keys.add(key)
+        file_path = save_job(job_data)
+        job_index.add_job(job_data.dict(), file_path)
+        job_files.append(file_path)
+    if len(job_files) < len(job_list.jobs):
+        print(f"Skipped {len(job_list.jobs) - len(job_files)} already processed jobs")
+    return job_files
+
+
 if __name__ == "__main__":
     asyncio.run(find_job())
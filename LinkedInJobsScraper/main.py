@@ -1,14 +1,26 @@
 #!/usr/bin/env python3
+import argparse
 import asyncio
 import os
 from colorama import init, Fore, Style
-from agents.search_jobs import find_job
+from agents.search_jobs import find_job, find_jobs, get_job_index
 from agents.apply import apply_to_job
 from agents.connection import send_connection_requests
+from agents.device_pool import DevicePool, list_devices
+from agents.profile_cache import get_job_context
+from agents.retry import (
+    CircuitBreaker,
+    JobUnavailable,
+    RetryPolicy,
+    SessionLoggedOut,
+    is_transient,
+)
 
 # Initialize colorama for cross-platform colored terminal text
 init(autoreset=True)
 
+PHONE_RESUME_LOCATION = "Documents/resume.pdf"
+
 
 def print_banner():
     banner = f"""
@@ -30,127 +42,272 @@ def print_agent_status(agent_name: str, color: str = Fore.BLUE):
     print(f"{color}{'='*50}{Style.RESET_ALL}")
 
 
-async def run_job_application_cycle():
-    cycle_count = 1
-    max_retries = 3
+# Backoff per stage; apply runs are the longest, so they wait longest
+STAGE_POLICIES = {
+    "SEARCH_JOBS": RetryPolicy(max_attempts=3, base_delay=5.0),
+    "CONNECTION": RetryPolicy(max_attempts=3, base_delay=10.0),
+    "APPLY": RetryPolicy(max_attempts=3, base_delay=15.0),
+}
+# Shared by every device, so repeated failures pause the stage everywhere
+STAGE_BREAKERS = {stage: CircuitBreaker() for stage in STAGE_POLICIES}
 
-    while True:
-        print(
-            f"\n{Fore.MAGENTA}{Style.BRIGHT}🔄 Starting Job Application Cycle #{cycle_count}{Style.RESET_ALL}"
-        )
-        print(f"{Fore.MAGENTA}{'='*60}{Style.RESET_ALL}")
 
-        # Step 1: Search for jobs with retry logic
-        job_file_path = None
-        for attempt in range(max_retries):
-            try:
-                print_agent_status("SEARCH_JOBS", Fore.CYAN)
-                if attempt > 0:
-                    print(
-                        f"{Fore.YELLOW}🔄 Retry attempt {attempt + 1}/{max_retries}{Style.RESET_ALL}"
-                    )
-
-                job_file_path = await find_job()
-
-                if job_file_path and os.path.exists(job_file_path):
-                    print(
-                        f"{Fore.GREEN}✅ Job found and saved to: {job_file_path}{Style.RESET_ALL}"
-                    )
-                    break
-                else:
-                    print(
-                        f"{Fore.RED}❌ Failed to find job. Attempt {attempt + 1}/{max_retries}{Style.RESET_ALL}"
-                    )
-                    if attempt == max_retries - 1:
-                        print(
-                            f"{Fore.RED}❌ All search attempts failed. Moving to next cycle...{Style.RESET_ALL}"
-                        )
-
-            except Exception as e:
-                print(
-                    f"{Fore.RED}❌ Error in SEARCH_JOBS (attempt {attempt + 1}/{max_retries}): {str(e)}{Style.RESET_ALL}"
-                )
-                if attempt == max_retries - 1:
-                    print(
-                        f"{Fore.RED}❌ All search attempts failed. Moving to next cycle...{Style.RESET_ALL}"
-                    )
+async def run_stage(stage: str, color: str, attempt_fn, success_message: str):
+    """
+    Runs one stage with its retry policy and circuit breaker.
 
-        # If job search failed completely, skip to next cycle
-        if not job_file_path or not os.path.exists(job_file_path):
-            cycle_count += 1
-            continue
+    Args:
+        stage: Key into STAGE_POLICIES and STAGE_BREAKERS
+        color: Colour of the stage's status lines
+        attempt_fn: Coroutine function running a single attempt; a falsy
+            result counts as a failed attempt
+        success_message: Printed when an attempt succeeds
 
-        # Step 2: Send connection requests with retry logic
-        connection_success = False
-        for attempt in range(max_retries):
-            try:
-                print_agent_status("CONNECTION", Fore.GREEN)
-                if attempt > 0:
-                    print(
-                        f"{Fore.YELLOW}🔄 Retry attempt {attempt + 1}/{max_retries}{Style.RESET_ALL}"
-                    )
-
-                connection_success = await send_connection_requests(job_file_path)
-
-                if connection_success:
-                    print(
-                        f"{Fore.GREEN}✅ Successfully sent connection requests!{Style.RESET_ALL}"
-                    )
-                    break
-                else:
-                    print(
-                        f"{Fore.RED}❌ Failed to send connection requests. Attempt {attempt + 1}/{max_retries}{Style.RESET_ALL}"
-                    )
-
-            except Exception as e:
-                print(
-                    f"{Fore.RED}❌ Error in CONNECTION (attempt {attempt + 1}/{max_retries}): {str(e)}{Style.RESET_ALL}"
-                )
+    Returns:
+        The first successful result, or None
+    """
+    policy = STAGE_POLICIES[stage]
+    breaker = STAGE_BREAKERS[stage]
 
-        # Step 3: Apply to the job with retry logic
-        apply_success = False
-        for attempt in range(max_retries):
-            try:
-                print_agent_status("APPLY", Fore.YELLOW)
-                if attempt > 0:
-                    print(
-                        f"{Fore.YELLOW}🔄 Retry attempt {attempt + 1}/{max_retries}{Style.RESET_ALL}"
-                    )
-
-                apply_success = await apply_to_job(
-                    job_data_file=job_file_path,
-                    candidate_data_file="candidate_data.json",
-                    phone_resume_location="Documents/resume.pdf",
-                )
+    for attempt in range(policy.max_attempts):
+        if not breaker.allow():
+            print(
+                f"{Fore.RED}⛔ {stage} paused after {breaker.failures} failures in a row "
+                f"(resumes in {breaker.retry_after():.0f}s). Skipping...{Style.RESET_ALL}"
+            )
+            return None
 
-                if apply_success:
-                    print(
-                        f"{Fore.GREEN}✅ Successfully applied to the job!{Style.RESET_ALL}"
-                    )
-                    break
-                else:
-                    print(
-                        f"{Fore.RED}❌ Failed to apply to the job. Attempt {attempt + 1}/{max_retries}{Style.RESET_ALL}"
-                    )
-
-            except Exception as e:
+        print_agent_status(stage, color)
+        if attempt > 0:
+            delay = policy.delay(attempt)
+            print(
+                f"{Fore.YELLOW}🔄 Retry attempt {attempt + 1}/{policy.max_attempts} in {delay:.0f}s{Style.RESET_ALL}"
+            )
+            await asyncio.sleep(delay)
+
+        try:
+            result = await attempt_fn()
+        except SessionLoggedOut as e:
+            # Nothing can run until LinkedIn is signed in again
+            for stage_breaker in STAGE_BREAKERS.values():
+                stage_breaker.trip()
+            print(
+                f"{Fore.RED}🔒 LinkedIn session logged out, pausing all stages: {str(e)}{Style.RESET_ALL}"
+            )
+            return None
+        except Exception as e:
+            if not is_transient(e):
+                # Specific to this job, so it does not count against the stage
                 print(
-                    f"{Fore.RED}❌ Error in APPLY (attempt {attempt + 1}/{max_retries}): {str(e)}{Style.RESET_ALL}"
+                    f"{Fore.RED}🚫 {stage} cannot succeed for this job, not retrying: {str(e)}{Style.RESET_ALL}"
                 )
+                return None
+            breaker.record_failure()
+            print(
+                f"{Fore.RED}❌ Error in {stage} (attempt {attempt + 1}/{policy.max_attempts}): {str(e)}{Style.RESET_ALL}"
+            )
+            continue
+
+        if result:
+            breaker.record_success()
+            print(f"{Fore.GREEN}✅ {success_message}{Style.RESET_ALL}")
+            return result
 
-        # Cycle completion summary
+        breaker.record_failure()
         print(
-            f"\n{Fore.MAGENTA}{Style.BRIGHT}📊 Cycle #{cycle_count} Summary:{Style.RESET_ALL}"
+            f"{Fore.RED}❌ {stage} failed. Attempt {attempt + 1}/{policy.max_attempts}{Style.RESET_ALL}"
         )
+
+    return None
+
+
+async def search_with_retries():
+    """Searches for one job, returning the saved job file or None"""
+
+    async def attempt():
+        job_file_path = await find_job()
+        if job_file_path and os.path.exists(job_file_path):
+            return job_file_path
+        return None
+
+    job_file_path = await run_stage(
+        "SEARCH_JOBS", Fore.CYAN, attempt, "Job found and saved"
+    )
+    if not job_file_path:
         print(
-            f"{Fore.CYAN}   Job Search: {'✅ Success' if job_file_path else '❌ Failed'}{Style.RESET_ALL}"
+            f"{Fore.RED}❌ All search attempts failed. Moving to next cycle...{Style.RESET_ALL}"
         )
+    return job_file_path
+
+
+async def search_batch_with_retries(batch_size: int, serial: str = None):
+    """Collects up to batch_size jobs in one agent session, returning their files"""
+    job_files = await run_stage(
+        "SEARCH_JOBS",
+        Fore.CYAN,
+        lambda: find_jobs(max_jobs=batch_size, serial=serial),
+        "Jobs found and saved to jobs/",
+    )
+    if not job_files:
         print(
-            f"{Fore.GREEN}   Connections: {'✅ Success' if connection_success else '❌ Failed'}{Style.RESET_ALL}"
+            f"{Fore.RED}❌ All search attempts failed. Moving to next cycle...{Style.RESET_ALL}"
         )
+    return job_files or []
+
+
+async def connect_with_retries(
+    job_file_path: str, serial: str = None, open_job: bool = False
+) -> bool:
+    """Sends connection requests for a job, retrying on failure"""
+    connection_success = await run_stage(
+        "CONNECTION",
+        Fore.GREEN,
+        lambda: send_connection_requests(
+            job_file_path, serial=serial, open_job=open_job
+        ),
+        "Successfully sent connection requests!",
+    )
+    return bool(connection_success)
+
+
+async def apply_with_retries(
+    job_file_path: str, serial: str = None, open_job: bool = False
+) -> bool:
+    """
+    Fills the application form for a job, retrying on failure.
+    The job counts as processed once it is applied to or can never be;
+    otherwise a later search may pick it up again.
+    """
+    unavailable = False
+
+    async def attempt():
+        nonlocal unavailable
+        try:
+            return await apply_to_job(
+                job_data_file=job_file_path,
+                candidate_data_file="candidate_data.json",
+                phone_resume_location=PHONE_RESUME_LOCATION,
+                serial=serial,
+                open_job=open_job,
+            )
+        except JobUnavailable:
+            unavailable = True
+            raise
+
+    apply_success = await run_stage(
+        "APPLY", Fore.YELLOW, attempt, "Successfully applied to the job!"
+    )
+    if apply_success or unavailable:
+        get_job_index().mark_processed(get_job_context(job_file_path).data, job_file_path)
+    return bool(apply_success)
+
+
+async def run_single_job_cycle(cycle_count: int):
+    """Finds one job, connects with its company and applies to it"""
+    # Step 1: Search for jobs with retry logic
+    job_file_path = await search_with_retries()
+
+    # If job search failed completely, skip to next cycle
+    if not job_file_path:
+        return False
+
+    # Step 2: Send connection requests with retry logic
+    connection_success = await connect_with_retries(job_file_path)
+
+    # Step 3: Apply to the job with retry logic
+    apply_success = await apply_with_retries(job_file_path)
+
+    # Cycle completion summary
+    print(
+        f"\n{Fore.MAGENTA}{Style.BRIGHT}📊 Cycle #{cycle_count} Summary:{Style.RESET_ALL}"
+    )
+    print(
+        f"{Fore.CYAN}   Job Search: {'✅ Success' if job_file_path else '❌ Failed'}{Style.RESET_ALL}"
+    )
+    print(
+        f"{Fore.GREEN}   Connections: {'✅ Success' if connection_success else '❌ Failed'}{Style.RESET_ALL}"
+    )
+    print(
+        f"{Fore.YELLOW}   Job Apply: {'✅ Success' if apply_success else '❌ Failed'}{Style.RESET_ALL}"
+    )
+    return True
+
+
+async def run_batch_cycle(cycle_count: int, batch_size: int):
+    """
+    Collects the top batch_size jobs in one search, then runs the
+    connection and apply stages for every job across all connected devices
+    """
+    pool = DevicePool(await list_devices())
+
+    # The search itself runs on the first device
+    job_files = await search_batch_with_retries(
+        batch_size, serial=pool.serials[0]
+    )
+    if not job_files:
+        return False
+
+    print(
+        f"\n{Fore.BLUE}{Style.BRIGHT}📦 Processing {len(job_files)} jobs on {len(pool)} device(s){Style.RESET_ALL}"
+    )
+
+    async def process_job(job_file_path, serial):
+        # Both stages run on the same device, each opening the job page first
+        connection_success = await connect_with_retries(
+            job_file_path, serial=serial, open_job=True
+        )
+        apply_success = await apply_with_retries(
+            job_file_path, serial=serial, open_job=True
+        )
+        return connection_success, apply_success
+
+    results = await pool.map(process_job, job_files)
+
+    # Cycle completion summary
+    print(
+        f"\n{Fore.MAGENTA}{Style.BRIGHT}📊 Cycle #{cycle_count} Summary:{Style.RESET_ALL}"
+    )
+    for job_file_path, result in zip(job_files, results):
+        if isinstance(result, Exception):
+            result = (False, False)
+        connection_success, apply_success = result
         print(
-            f"{Fore.YELLOW}   Job Apply: {'✅ Success' if apply_success else '❌ Failed'}{Style.RESET_ALL}"
+            f"{Fore.CYAN}   {os.path.basename(job_file_path)}: "
+            f"Connections {'✅' if connection_success else '❌'}  "
+            f"Apply {'✅' if apply_success else '❌'}{Style.RESET_ALL}"
         )
+    applied = sum(1 for result in results if isinstance(result, tuple) and result[1])
+    print(
+        f"{Fore.YELLOW}   Applied to {applied}/{len(job_files)} jobs{Style.RESET_ALL}"
+    )
+    return True
+
+
+async def run_job_application_cycle(batch_size: int = None):
+    cycle_count = 1
+
+    while True:
+        print(
+            f"\n{Fore.MAGENTA}{Style.BRIGHT}🔄 Starting Job Application Cycle #{cycle_count}{Style.RESET_ALL}"
+        )
+        print(f"{Fore.MAGENTA}{'='*60}{Style.RESET_ALL}")
+
+        if batch_size:
+            completed = await run_batch_cycle(cycle_count, batch_size)
+        else:
+            completed = await run_single_job_cycle(cycle_count)
+
+        # If job search failed completely, skip to next cycle
+        if not completed:
+            search_breaker = STAGE_BREAKERS["SEARCH_JOBS"]
+            if search_breaker.is_open:
+                wait = search_breaker.retry_after()
+                print(
+                    f"{Fore.YELLOW}⏳ Job search keeps failing, waiting {wait:.0f}s before the next cycle...{Style.RESET_ALL}"
+                )
+                await asyncio.sleep(wait)
+            cycle_count += 1
+            continue
 
         # Ask user if they want to continue
         print(
@@ -168,8 +325,20 @@ async def run_job_application_cycle():
         cycle_count += 1
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="JobDroid LinkedIn job application assistant")
+    parser.add_argument(
+        "--batch",
+        type=int,
+        metavar="N",
+        help="Collect the top N jobs per cycle and process them across all connected devices",
+    )
+    return parser.parse_args()
+
+
 async def main():
     """Main function"""
+    args = parse_args()
     print_banner()
     input()  # Wait for user to press Enter
 
@@ -189,7 +358,7 @@ async def main():
         f"{Fore.GREEN}✅ All required files found. Starting job application process...{Style.RESET_ALL}"
     )
 
-    await run_job_application_cycle()
+    await run_job_application_cycle(batch_size=args.batch)
 
 
 if __name__ == "__main__":
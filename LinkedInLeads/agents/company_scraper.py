@@ -3,34 +3,126 @@ import asyncio
 import os
 import json
 from datetime import datetime
-from droidrun import DroidAgent
+from typing import List, Optional, Union
+from pydantic import BaseModel, Field
+from droidrun import AdbTools, DroidAgent
 from droidrun.config_manager.config_manager import (
     DroidrunConfig,
     TracingConfig,
     LoggingConfig,
     AgentConfig,
+    DeviceConfig,
 )
-from llama_index.llms.google_genai import GoogleGenAI
+from agents.llm_pool import get_llm
 from agents.prompts import prompts
-from agents.utils import json_to_csv
+from agents.utils import (
+    CsvSink,
+    JsonlLog,
+    event_text,
+    extract_json_objects,
+    parse_json_lenient,
+    rows_to_parquet,
+)
+from agents.lead_connector import get_lead_index
+from agents.normalization import CompanyIndex, normalize_company
+from agents.lead_store import get_lead_store
 from dotenv import load_dotenv
 
 load_dotenv()
 
 
+COMPANY_FIELDS = ["name", "industry", "location", "follower_count"]
+
+
+class Company(BaseModel):
+    name: str = Field(description="Name of the company")
+    industry: Optional[str] = Field(default=None, description="Industry of the company")
+    location: Optional[str] = Field(default=None, description="Location of the company")
+    follower_count: Optional[Union[int, str]] = Field(
+        default=None, description="Follower count of the company on LinkedIn"
+    )
+
+
+class CompanyList(BaseModel):
+    companies: List[Company] = Field(
+        default_factory=list, description="Companies matching the search filters"
+    )
+
+
+def companies_file_paths(
+    user_config: dict, output_directory: str = "data/companies/", timestamp: str = None
+):
+    """
+    Returns the (json, csv, jsonl) paths a scrape started at ``timestamp`` writes to
+    """
+    timestamp = timestamp or datetime.now().strftime("%Y%m%d_%H%M%S")
+    base_name = f"companies_{user_config['industry'].replace(' ', '_')}_{timestamp}"
+    return tuple(
+        os.path.join(output_directory, f"{base_name}.{extension}")
+        for extension in ("json", "csv", "jsonl")
+    )
+
+
+def extract_companies(output) -> list:
+    """
+    Extracts company objects from structured agent output, or from free
+    agent text (repairing truncated or malformed JSON where possible)
+    """
+    if isinstance(output, CompanyList):
+        return [company.model_dump() for company in output.companies]
+
+    parsed = parse_json_lenient(output)
+    if isinstance(parsed, list):
+        parsed = {"companies": parsed}
+    items = [parsed] if isinstance(parsed, dict) else []
+    # Fall back to every complete object embedded in the text
+    if isinstance(output, str):
+        items += extract_json_objects(output)
+
+    companies = []
+    for item in items:
+        if isinstance(item.get("companies"), list):
+            companies.extend(
+                company for company in item["companies"] if isinstance(company, dict)
+            )
+        elif "name" in item:
+            companies.append(item)
+    # Drop the schema example from the prompt
+    return [
+        company
+        for company in companies
+        if isinstance(company.get("name"), str)
+        and company["name"].strip()
+        and company["name"] != "string"
+    ]
+
+
 async def scrape_companies(
-    user_config: dict, output_directory: str = "data/companies/"
+    user_config: dict,
+    output_directory: str = "data/companies/",
+    company_queue: asyncio.Queue = None,
+    timestamp: str = None,
+    serial: str = None,
 ):
     """
-    Scrapes LinkedIn for companies matching the user's criteria
+    Scrapes LinkedIn for companies matching the user's criteria on the
+    given device (defaults to the only connected device).
+
+    Company batches the agent emits while browsing are appended to the
+    companies CSV/JSONL as soon as they appear and, if company_queue is
+    given, pushed to it for consumers (followed by a None sentinel when
+    scraping ends). A run that dies part way still keeps what it found.
     """
-    # Use default configuration with built-in LLM profiles
-    llm = GoogleGenAI(
-        api_key=os.environ["GEMINI_API_KEY"],
-        model="gemini-2.5-pro",
+    timestamp = timestamp or datetime.now().strftime("%Y%m%d_%H%M%S")
+    json_file_path, csv_file_path, jsonl_file_path = companies_file_paths(
+        user_config, output_directory, timestamp
     )
+
+    # Reuse the shared LLM client
+    llm = get_llm(model="gemini-2.5-pro")
     config = DroidrunConfig(
         agent=AgentConfig(reasoning=True, max_steps=75),
+        device=DeviceConfig(serial=serial),
         tracing=TracingConfig(enabled=False),
         logging=LoggingConfig(debug=True, save_trajectory="action"),
     )
@@ -46,87 +138,113 @@ async def scrape_companies(
         ),
         config=config,
         llms=llm,
+        tools=AdbTools(serial=serial),
+        output_model=CompanyList,
     )
 
-    # Run agent
-    result = await agent.run()
-
-    # Check results (result is a ResultEvent object)
-    print(f"Success: {result.success}")
-    print(f"Reason: {result.reason}")
-    print(f"Steps: {result.steps}")
-    if result.output:
-        print(f"Output: {result.output}")
-
-    if result.success and result.output:
-        # Parse the JSON output
-        try:
-            companies_data = json.loads(result.output)
-
-            # Create output directory
-            os.makedirs(output_directory, exist_ok=True)
-
-            # Generate filename with timestamp
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            json_filename = f"companies_{user_config['industry'].replace(' ', '_')}_{timestamp}.json"
-            json_file_path = os.path.join(output_directory, json_filename)
-            csv_filename = (
-                f"companies_{user_config['industry'].replace(' ', '_')}_{timestamp}.csv"
-            )
-            csv_file_path = os.path.join(output_directory, csv_filename)
-
-            # Save companies data to JSON
-            with open(json_file_path, "w") as f:
-                json.dump(
-                    {
-                        "user_config": user_config,
-                        "companies": companies_data,
-                        "scraped_at": timestamp,
-                    },
-                    f,
-                    indent=4,
-                )
-
-            # Save companies data to CSV
-            try:
-                # Create a temporary JSON file that we'll convert to CSV
-                temp_json = os.path.join(output_directory, f"temp_{timestamp}.json")
-
-                # Extract companies list from the response - handle both formats
-                if isinstance(companies_data, dict):
-                    companies_list = companies_data.get("companies", [])
-                else:
-                    companies_list = companies_data
-
-                # Write companies list to temporary JSON
-                with open(temp_json, "w") as f:
-                    json.dump(companies_list, f)
-
-                # Convert JSON to CSV
-                field_mapping = {
-                    "name": "name",
-                    "industry": "industry",
-                    "location": "location",
-                    "follower_count": "follower_count",
-                }
-
-                json_to_csv(temp_json, csv_file_path, field_mapping)
-
-                # Remove temporary JSON file
-                if os.path.exists(temp_json):
-                    os.remove(temp_json)
-
-                print(f"Companies data saved to CSV: {csv_file_path}")
-            except Exception as e:
-                print(f"Error saving companies to CSV: {e}")
-
-            return json_file_path
-
-        except json.JSONDecodeError as e:
-            print(f"Error parsing JSON output: {e}")
-            return None
-
-    return None
+    lead_index = get_lead_index()
+    companies_list = []
+    # Catches the same company reported twice under slightly different names
+    seen = CompanyIndex()
+    skipped = 0
+
+    csv_sink = CsvSink(csv_file_path, COMPANY_FIELDS, max_rows=1)
+    companies_log = JsonlLog(jsonl_file_path, fsync_every=1)
+
+    async def add_companies(found):
+        nonlocal skipped
+        for company in map(normalize_company, found):
+            if company["name"] in seen:
+                continue
+            seen.add(company["name"])
+
+            # Drop companies where earlier cycles already searched every
+            # current role; the connector skips individual searched roles.
+            # Expanded roles replace the keywords once role generation ends.
+            roles = user_config.get("expanded_roles") or user_config.get("role_keywords", [])
+            if roles and all(lead_index.has_search(company["name"], role) for role in roles):
+                skipped += 1
+                continue
+
+            companies_list.append(company)
+            csv_sink.write_row({field: company.get(field, "") for field in COMPANY_FIELDS})
+            companies_log.append(company)
+            if company_queue is not None:
+                # Blocks while a bounded queue is full, pacing the scraper
+                await company_queue.put(company)
+
+    try:
+        # Run agent, capturing the company arrays it emits after each screen
+        handler = agent.run()
+        async for event in handler.stream_events():
+            found = extract_companies(event_text(event))
+            if found:
+                count = len(companies_list)
+                await add_companies(found)
+                if len(companies_list) > count:
+                    print(f"📥 {len(companies_list)} companies scraped so far")
+        result = await handler
+
+        # Check results (result is a ResultEvent object)
+        print(f"Success: {result.success}")
+        print(f"Reason: {result.reason}")
+        print(f"Steps: {result.steps}")
+        if result.output:
+            print(f"Output: {result.output}")
+
+            # Final output is authoritative; merge anything not streamed
+            final_companies = extract_companies(result.output)
+            if not final_companies:
+                print("Error parsing output: no companies found")
+            await add_companies(final_companies)
+    except Exception as e:
+        print(f"Error while scraping companies: {e}")
+    finally:
+        csv_sink.close()
+        companies_log.close()
+        if company_queue is not None:
+            await company_queue.put(None)
+
+    if skipped:
+        print(f"Skipping {skipped} companies already searched for every role")
+    if not companies_list:
+        print("No new companies found")
+        for file_path in (csv_file_path, jsonl_file_path):
+            if os.path.exists(file_path):
+                os.remove(file_path)
+        return None
+
+    # Save companies data to JSON
+    with open(json_file_path, "w") as f:
+        json.dump(
+            {
+                "user_config": user_config,
+                "companies": companies_list,
+                "scraped_at": datetime.strptime(timestamp, "%Y%m%d_%H%M%S").isoformat(),
+            },
+            f,
+            indent=4,
+        )
+
+    print(f"Companies data saved to CSV: {csv_file_path}")
+
+    get_lead_store().add_companies(
+        companies_list, json_file_path, user_config.get("region"), timestamp
+    )
+
+    # Columnar copy straight from the parsed companies, when pyarrow is installed
+    parquet_file_path = os.path.splitext(json_file_path)[0] + ".parquet"
+    try:
+        if rows_to_parquet(
+            companies_list,
+            parquet_file_path,
+            field_mappings={field: field for field in COMPANY_FIELDS},
+        ):
+            print(f"Companies data saved to Parquet: {parquet_file_path}")
+    except Exception as e:
+        print(f"Error saving companies to Parquet: {e}")
+
+    return json_file_path
 
 
 if __name__ == "__main__":
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+ADB device pool for LeadSpot.
+
+Shards a queue of agent tasks across every connected Android device
+(or emulator), running one worker per device and collecting results in
+task order. Agents on the same device would fight over its one screen,
+so more parallelism means more devices: each emulator instance has its
+own serial and counts as a separate device. Tasks can also be streamed in through
+an asyncio queue while they are still being produced.
+"""
+import asyncio
+
+
+async def list_devices() -> list:
+    """
+    Returns the serials of all devices reported as ready by `adb devices`
+    """
+    try:
+        process = await asyncio.create_subprocess_exec(
+            "adb",
+            "devices",
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+        stdout, _ = await process.communicate()
+    except FileNotFoundError:
+        print("adb not found on PATH, falling back to the default device")
+        return []
+
+    serials = []
+    for line in stdout.decode().splitlines()[1:]:
+        parts = line.split()
+        if len(parts) >= 2 and parts[1] == "device":
+            serials.append(parts[0])
+    return serials
+
+
+class DevicePool:
+    """
+    Runs tasks across a pool of devices.
+
+    Every device gets a single worker pulling from one shared queue, so
+    faster devices naturally pick up more work and throughput scales with
+    the number of devices.
+    """
+
+    def __init__(self, serials: list):
+        # A None serial lets droidrun pick the only connected device;
+        # duplicates would put two agents on one screen
+        self.serials = list(dict.fromkeys(serials)) or [None]
+
+    def __len__(self):
+        return len(self.serials)
+
+    async def map(self, handler, tasks: list) -> list:
+        """
+        Runs ``handler(task, serial)`` for every task and returns the results
+        in the same order as ``tasks``. Exceptions raised by the handler are
+        returned in place of a result.
+
+        Args:
+            handler: Coroutine function taking a task and a device serial
+            tasks: List of tasks to distribute
+        """
+        queue = asyncio.Queue()
+        for index, task in enumerate(tasks):
+            queue.put_nowait((index, task))
+
+        results = [None] * len(tasks)
+
+        async def worker(serial):
+            while True:
+                try:
+                    index, task = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    results[index] = await handler(task, serial)
+                except Exception as e:
+                    results[index] = e
+
+        await asyncio.gather(*(worker(serial) for serial in self.serials))
+        return results
+
+    async def consume(self, handler, task_queue: asyncio.Queue) -> list:
+        """
+        Runs ``handler(task, serial)`` for tasks as they arrive on
+        ``task_queue`` until a ``None`` sentinel is received, returning the
+        results in completion order.
+
+        Args:
+            handler: Coroutine function taking a task and a device serial
+            task_queue: Queue of tasks terminated by None
+        """
+        results = []
+
+        async def worker(serial):
+            while True:
+                task = await task_queue.get()
+                if task is None:
+                    # Leave the sentinel for the other workers
+                    task_queue.put_nowait(None)
+                    return
+                try:
+                    results.append(await handler(task, serial))
+                except Exception as e:
+                    results.append(e)
+
+        await asyncio.gather(*(worker(serial) for serial in self.serials))
+        return results
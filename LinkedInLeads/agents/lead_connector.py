@@ -1,111 +1,495 @@
 #!/usr/bin/env python3
 import asyncio
 import os
+import csv
 import json
 from datetime import datetime
-from droidrun import DroidAgent
-from droidrun.config_manager.config_manager import (
-    DroidrunConfig,
-    TracingConfig,
-    LoggingConfig,
-    AgentConfig,
-)
-from llama_index.llms.google_genai import GoogleGenAI
+from typing import List
+from pydantic import BaseModel, Field
+from agents.llm_pool import get_llm
 from agents.prompts import prompts
-from agents.utils import append_to_csv
+from agents.session import AbortedRun, DeviceSession
+from agents.step_budget import StepBudget
+from agents.metrics import (
+    finish_task,
+    install_llm_instrumentation,
+    load_metrics,
+    print_report,
+    start_task,
+)
+from agents.rate_limiter import get_rate_limiter, rate_metrics
+from agents.device_pool import DevicePool, list_devices
+from agents.work_queue import WorkQueue, DONE, FAILED, IN_PROGRESS, PENDING
+from agents.lead_index import LeadIndex
+from agents.normalization import CompanyIndex, merge_companies, normalize_company
+from agents.task_scheduler import TaskScheduler, role_hits
+from agents.lead_store import get_lead_store
+from agents.utils import (
+    iter_jsonl,
+    migrate_json_to_jsonl,
+    open_csv_sink,
+    open_jsonl_log,
+    parse_json_lenient,
+)
 from dotenv import load_dotenv
 
 load_dotenv()
 
 
-async def connect_with_leads(companies_file: str, user_config: dict):
+class ConnectionSummary(BaseModel):
+    connections_sent: int = Field(default=0, description="Number of connection requests sent")
+    people_contacted: List[str] = Field(
+        default_factory=list, description="Name and role of each person contacted"
+    )
+    roles_matched: List[str] = Field(
+        default_factory=list,
+        description="Target role each contacted person matched, in the same order",
+    )
+    messages_sent: List[str] = Field(
+        default_factory=list, description="Message sent to each person, in the same order"
+    )
+
+
+LOGS_DIRECTORY = "data/logs"
+CONNECTIONS_LOG = os.path.join(LOGS_DIRECTORY, "connections.jsonl")
+LEGACY_CONNECTIONS_LOG = os.path.join(LOGS_DIRECTORY, "connections.json")
+CONNECTIONS_CSV = os.path.join(LOGS_DIRECTORY, "connections.csv")
+LEAD_INDEX = os.path.join(LOGS_DIRECTORY, "lead_index.jsonl")
+TASK_OUTCOMES_LOG = os.path.join(LOGS_DIRECTORY, "task_outcomes.jsonl")
+STEP_HISTORY_LOG = os.path.join(LOGS_DIRECTORY, "step_history.jsonl")
+# Predicted hit rate below which a well-tried role is skipped
+MIN_TASK_SCORE = 0.05
+CONNECTIONS_CSV_FIELDS = [
+    "timestamp",
+    "company_name",
+    "company_industry",
+    "company_location",
+    "role_searched",
+    "person_contacted",
+    "message_sent",
+    "goal_intent",
+]
+
+
+def get_connection_log():
     """
-    Connects with prospects at the scraped companies
+    Returns the shared append-only connections log, migrating the legacy
+    connections.json array into it the first time it is opened
     """
-    # Load companies data
-    with open(companies_file, "r") as f:
-        companies_data = json.load(f)
+    migrated = migrate_json_to_jsonl(LEGACY_CONNECTIONS_LOG, CONNECTIONS_LOG)
+    if migrated:
+        print(f"📦 Migrated {migrated} logged connections to {CONNECTIONS_LOG}")
+    return open_jsonl_log(CONNECTIONS_LOG)
+
+
+def get_connections_csv():
+    """
+    Returns the shared buffered writer for the connections CSV
+    """
+    return open_csv_sink(CONNECTIONS_CSV, CONNECTIONS_CSV_FIELDS)
+
+
+def iter_connection_csv_rows():
+    """
+    Streams rows of the connections CSV as dictionaries
+    """
+    if not os.path.exists(CONNECTIONS_CSV):
+        return
+    with open(CONNECTIONS_CSV, "r", newline="") as f:
+        for row in csv.DictReader(f, fieldnames=CONNECTIONS_CSV_FIELDS):
+            # Skip the header row if the file has one
+            if row.get("timestamp") == "timestamp":
+                continue
+            yield row
+
+
+_lead_index = None
+
+
+def get_lead_index():
+    """
+    Returns the shared deduplication index, building it from the
+    connection logs the first time it is used
+    """
+    global _lead_index
+    if _lead_index is None:
+        _lead_index = LeadIndex(LEAD_INDEX)
+        # Older indexes keyed people by name only; rebuild them by company
+        if not _lead_index.exists or (_lead_index.legacy_people and not _lead_index.people):
+            _lead_index.build(iter_connections(), iter_connection_csv_rows())
+            print(
+                f"🗂️ Built lead index: {len(_lead_index.companies)} companies, "
+                f"{len(_lead_index.people)} people"
+            )
+    return _lead_index
+
+
+_task_scheduler = None
+
+
+def get_task_scheduler():
+    """
+    Returns the shared task scheduler, seeding its history from the
+    connection logs the first time it is used
+    """
+    global _task_scheduler
+    if _task_scheduler is None:
+        _task_scheduler = TaskScheduler(TASK_OUTCOMES_LOG)
+        if not _task_scheduler.exists:
+            _task_scheduler.build(iter_connections())
+    return _task_scheduler
+
+
+_step_budget = None
+
+
+def get_step_budget():
+    """
+    Returns the shared step budget learned from past connector runs
+    """
+    global _step_budget
+    if _step_budget is None:
+        _step_budget = StepBudget(STEP_HISTORY_LOG)
+    return _step_budget
 
-    companies = companies_data.get("companies", [])
-    if not companies:
-        print("No companies found in the data file")
-        return False
 
-    # Use default configuration with built-in LLM profiles
-    llm = GoogleGenAI(
-        api_key=os.environ["GEMINI_API_KEY"],
-        model="gemini-2.5-pro",
+def iter_connections():
+    """
+    Streams logged connections one entry at a time
+    """
+    migrate_json_to_jsonl(LEGACY_CONNECTIONS_LOG, CONNECTIONS_LOG)
+    yield from iter_jsonl(CONNECTIONS_LOG)
+
+
+async def connect_with_leads(
+    companies_file: str,
+    user_config: dict,
+    devices: list = None,
+    batch_roles: bool = False,
+    company_queue: asyncio.Queue = None,
+):
+    """
+    Connects with prospects at the scraped companies, sharding the
+    (company, role) searches across all connected devices.
+
+    Progress is checkpointed in the work queue, so calling this again for
+    the same companies file only re-runs searches that have not succeeded.
+    With batch_roles, a single agent session per company searches for all
+    roles at once instead of one session per (company, role).
+
+    If company_queue is given, companies are consumed from it as the
+    scraper produces them (until a None sentinel) instead of being read
+    from companies_file, which is then only used as the campaign key.
+    companies_file is either the scraper's JSON file or the JSONL file it
+    appends to while scraping, which is what a pipelined campaign is keyed
+    on so it can be resumed after a crash.
+    """
+    companies = []
+    if company_queue is None:
+        companies = load_companies(companies_file)
+        if not companies:
+            print("No companies found in the data file")
+            return False
+
+        # Merge near-duplicate companies so each is only searched once
+        merged = merge_companies(companies)
+        if len(merged) < len(companies):
+            print(f"🔗 Merged {len(companies) - len(merged)} duplicate companies")
+        companies = merged
+
+    # Reuse the shared LLM client
+    llm = get_llm(model="gemini-2.5-pro")
+    install_llm_instrumentation()
+    campaign_started_at = datetime.now().isoformat(timespec="seconds")
+
+    # Get expanded roles from user config
+    roles_to_search = user_config.get(
+        "expanded_roles", user_config.get("role_keywords", [])
     )
 
-    success_count = 0
-    total_companies = len(companies)
+    lead_index = get_lead_index()
+    scheduler = get_task_scheduler()
+    min_score = user_config.get("min_task_score", MIN_TASK_SCORE)
+    low_yield_skipped = 0
+    queue = WorkQueue()
+    recovered = queue.recover(companies_file)
+    if recovered:
+        print(f"♻️ Recovered {recovered} interrupted searches")
 
-    # Process each company
-    for i, company in enumerate(companies, 1):
-        print(
-            f"\n🏢 Processing company {i}/{total_companies}: {company.get('name', 'Unknown')}"
+    def company_tasks(company):
+        nonlocal low_yield_skipped
+        company_name = company.get("name", "")
+        # Skip searches already run by any earlier campaign
+        roles = [
+            role
+            for role in roles_to_search
+            if not lead_index.has_search(company_name, role)
+        ]
+        # Highest predicted yield first, dropping roles that rarely pay off
+        roles, skipped = scheduler.prioritize(company, roles, min_score)
+        low_yield_skipped += len(skipped)
+        if not roles:
+            return []
+        if batch_roles:
+            # One agent session per company covering every role not yet searched
+            tasks = [(company, roles)]
+        else:
+            tasks = [(company, role) for role in roles]
+
+        queue.enqueue(
+            companies_file, [(company_name, role_label(role)) for _, role in tasks]
         )
+        # Skip searches already completed by an earlier run of this campaign
+        return [
+            (company, role)
+            for company, role in tasks
+            if queue.status(companies_file, company_name, role_label(role)) != DONE
+        ]
+
+    if devices is None:
+        devices = await list_devices()
+    pool = DevicePool(devices)
+
+    # One long-lived session per device for the whole campaign
+    sessions = {serial: DeviceSession(serial, llm=llm) for serial in pool.serials}
 
-        # Get expanded roles from user config
-        roles_to_search = user_config.get(
-            "expanded_roles", user_config.get("role_keywords", [])
+    async def handler(task, serial):
+        company, role = task
+        company_name = company.get("name", "")
+        label = role_label(role)
+        queue.start(companies_file, company_name, label)
+        success = await connect_with_company_role(
+            company, role, user_config, sessions[serial]
         )
+        if success:
+            queue.complete(companies_file, company_name, label)
+        else:
+            queue.fail(companies_file, company_name, label, "agent run failed")
+        return success
 
-        for role in roles_to_search:
-            try:
-                # Create configuration for this agent
-                config = DroidrunConfig(
-                    agent=AgentConfig(reasoning=True, max_steps=30),
-                    tracing=TracingConfig(enabled=False),
-                    logging=LoggingConfig(debug=True, save_trajectory="action"),
-                )
+    async def feed_tasks(task_queue):
+        seen = CompanyIndex()
+        while True:
+            company = await company_queue.get()
+            if company is None:
+                break
+            company = normalize_company(company)
+            if company["name"] in seen:
+                continue
+            seen.add(company["name"])
+            for task in company_tasks(company):
+                task_queue.put_nowait(task)
+        task_queue.put_nowait(None)
 
-                # Create agent for this specific company and role
-                # LLMs can also be automatically loaded from config.llm_profiles
-                agent = DroidAgent(
-                    goal=prompts.LEAD_CONNECTOR_GOAL(
-                        company_name=company.get("name", ""),
-                        role_title=role,
-                        goal_intent=user_config["goal_intent"],
-                        about_yourself=user_config["about_yourself"],
-                        user_config=user_config,
-                    ),
-                    config=config,
-                    llms=llm,
-                )
+    try:
+        if company_queue is None:
+            tasks = [task for company in companies for task in company_tasks(company)]
+            tasks.sort(key=lambda task: scheduler.score(*task), reverse=True)
+            # Tasks left pending by a run with other roles would never run
+            retired = queue.retire(
+                companies_file,
+                [(company.get("name", ""), role_label(role)) for company, role in tasks],
+            )
+            if retired:
+                print(f"🧹 Skipping {retired} searches no longer part of this campaign")
+            print(
+                f"\n🏢 Processing {len(companies)} companies x {len(roles_to_search)} roles "
+                f"({len(tasks)} agent runs remaining) on {len(pool)} device(s)"
+            )
+            results = await pool.map(handler, tasks)
+        else:
+            print(
+                f"\n🏢 Connecting with leads as companies are scraped on {len(pool)} device(s)"
+            )
+            task_queue = asyncio.Queue()
+            _, results = await asyncio.gather(
+                feed_tasks(task_queue), pool.consume(handler, task_queue)
+            )
+        counts = queue.counts(companies_file)
+    finally:
+        queue.close()
+    success_count = sum(1 for result in results if result is True)
 
-                # Run agent
-                result = await agent.run()
-                print(
-                    f"🔍 Searching for {role} at {company.get('name', 'Unknown')}: {'✅' if result.success else '❌'}"
-                )
+    get_connection_log().sync()
+    get_connections_csv().flush()
 
-                if result.success:
-                    success_count += 1
+    if not results:
+        # Every search was already run or filtered out
+        print("\n✅ Nothing to do: all searches for these companies are done or skipped")
+    else:
+        print(f"\n📊 Connection Summary: {success_count} successful connections made")
+    print(f"📋 Campaign progress: {counts[DONE]} done, {counts[FAILED]} failed")
+    if low_yield_skipped:
+        print(f"⏭️ Skipped {low_yield_skipped} low-yield searches")
+    for metrics in rate_metrics():
+        print(
+            f"⏱️ {metrics['limiter']}: {metrics['rate_per_minute']} runs/min, "
+            f"{metrics['failure_rate']:.0%} recent failures"
+        )
+    print_report(load_metrics(since=campaign_started_at))
+    # Only report success once nothing is left to retry
+    return counts[PENDING] == counts[IN_PROGRESS] == counts[FAILED] == 0
 
-                    # Log successful connection
-                    await log_connection(
-                        company, role, user_config, result.output or ""
-                    )
 
-                # Brief pause between searches to avoid overwhelming LinkedIn
-                await asyncio.sleep(2)
+def load_companies(companies_file: str) -> list:
+    """
+    Reads the companies of a scraper JSON file, or of the JSONL file the
+    scraper appends to as companies arrive
+    """
+    if companies_file.endswith(".jsonl"):
+        return list(iter_jsonl(companies_file))
+    with open(companies_file, "r") as f:
+        companies_data = json.load(f)
+    return companies_data.get("companies", [])
 
-            except Exception as e:
-                print(
-                    f"❌ Error processing {role} at {company.get('name', 'Unknown')}: {str(e)}"
-                )
-                continue
 
-    print(f"\n📊 Connection Summary: {success_count} successful connections made")
-    return success_count > 0
+def role_label(role) -> str:
+    """
+    Returns a printable label for a single role or a batch of roles
+    """
+    if isinstance(role, (list, tuple)):
+        return " | ".join(role)
+    return role
+
+
+async def connect_with_company_role(
+    company: dict, role, user_config: dict, session: DeviceSession
+) -> bool:
+    """
+    Runs a single lead connector agent for one company on a device session.
+    ``role`` is either one role title or a list of role titles to cover
+    in the same session.
+    """
+    device_label = session.label
+    batch = isinstance(role, (list, tuple))
+    # Adaptive pacing replaces a fixed pause between searches
+    limiters = [
+        get_rate_limiter(f"device:{device_label}"),
+        get_rate_limiter(
+            f"account:{user_config.get('linkedin_account', 'default')}",
+            rate=60.0,
+            min_rate=5.0,
+            max_rate=120.0,
+        ),
+    ]
+    task_metrics = start_task(
+        device=device_label,
+        company=company.get("name", ""),
+        role=role_label(role),
+        task_type=f"batch:{len(role)}" if batch else "single",
+    )
+    try:
+        # Budgets are learned per task type; batched sessions start larger
+        task_type = f"batch:{len(role)}" if batch else "single"
+        default_steps = min(30 + 10 * (len(role) - 1), 100) if batch else 30
+        step_budget = get_step_budget()
+        max_steps = step_budget.budget(task_type, default_steps)
+        # Stops runs that go too long without reaching anyone to connect with
+        watcher = step_budget.watcher(task_type, max_steps)
+
+        # People reached by earlier runs are skipped by the agent itself
+        known_contacts = get_lead_index().contacted_at(company.get("name", ""))
+        if batch:
+            goal = prompts.LEAD_CONNECTOR_BATCH_GOAL(
+                company_name=company.get("name", ""),
+                role_titles=list(role),
+                goal_intent=user_config["goal_intent"],
+                about_yourself=user_config["about_yourself"],
+                user_config=user_config,
+                known_contacts=known_contacts,
+            )
+        else:
+            goal = prompts.LEAD_CONNECTOR_GOAL(
+                company_name=company.get("name", ""),
+                role_title=role,
+                goal_intent=user_config["goal_intent"],
+                about_yourself=user_config["about_yourself"],
+                user_config=user_config,
+                known_contacts=known_contacts,
+            )
+
+        # Wait for both the device and the account to allow another run
+        for limiter in limiters:
+            await limiter.acquire()
+        task_metrics.wait_time = task_metrics.elapsed()
+
+        # Run agent for this specific company and role
+        result = await session.run(
+            goal, max_steps=max_steps, output_model=ConnectionSummary, on_event=watcher
+        )
+        aborted = isinstance(result, AbortedRun)
+        step_budget.record(
+            task_type, result.success, result.steps, watcher.progress_step, aborted
+        )
+        if aborted:
+            # A stall may be the device or navigation, not an empty company,
+            # so the search stays open and is retried by a later run
+            print(
+                f"⏹️ [{device_label}] No progress on {role_label(role)} at {company.get('name', 'Unknown')} "
+                f"within {watcher.stall_steps} steps, stopping early to retry later"
+            )
+            for limiter in limiters:
+                limiter.cool_down()
+        else:
+            for limiter in limiters:
+                limiter.record(result.success, steps=result.steps, reason=result.reason)
+            print(
+                f"🔍 [{device_label}] Searching for {role_label(role)} at {company.get('name', 'Unknown')}: {'✅' if result.success else '❌'}"
+            )
+
+        hits = {}
+        if result.success:
+            # Log successful connection
+            hits = await log_connection(
+                company, role, user_config, result.output, steps=result.steps
+            )
+
+        # Failed runs count as searches that found nobody; stalled runs
+        # say nothing about the company
+        if not aborted:
+            scheduler = get_task_scheduler()
+            for searched_role in role if batch else [role]:
+                scheduler.record(company, searched_role, hits.get(searched_role, 0))
 
+        task_metrics.steps = result.steps
+        task_metrics.success = bool(result.success)
+        task_metrics.aborted = aborted
+        task_metrics.connections = sum(hits.values())
+        return bool(result.success)
 
-async def log_connection(company: dict, role: str, user_config: dict, output: str):
+    except Exception as e:
+        for limiter in limiters:
+            limiter.record(False, reason=str(e))
+        task_metrics.error = str(e)
+        print(
+            f"❌ [{device_label}] Error processing {role_label(role)} at {company.get('name', 'Unknown')}: {str(e)}"
+        )
+        return False
+    finally:
+        finish_task(task_metrics)
+
+
+async def log_connection(
+    company: dict, role, user_config: dict, output, steps: int = None
+):
     """
-    Log successful connections for tracking
+    Log successful connections for tracking.
+    ``role`` is one role title or the list of roles of a batched search,
+    ``output`` is a ConnectionSummary or the agent's raw text output and
+    ``steps`` the number of agent steps the run took.
+
+    Returns:
+        Number of people contacted per searched role
     """
     timestamp = datetime.now().isoformat()
+    if isinstance(output, ConnectionSummary):
+        output_data = output.model_dump()
+        output = json.dumps(output_data)
+    else:
+        output = output or ""
+        output_data = parse_json_lenient(output)
+    roles = list(role) if isinstance(role, (list, tuple)) else [role]
+    role = role_label(role)
     log_entry = {
         "timestamp": timestamp,
         "company": company,
@@ -113,71 +497,50 @@ async def log_connection(company: dict, role: str, user_config: dict, output: st
         "goal_intent": user_config["goal_intent"],
         "output": output,
         "success": True,
+        "steps": steps,
     }
-
-    # Create logs directory
-    os.makedirs("data/logs", exist_ok=True)
+    if len(roles) > 1:
+        log_entry["roles_searched"] = roles
 
     # Append to connections log
-    log_file = "data/logs/connections.json"
-    csv_file = "data/logs/connections.csv"
+    get_connection_log().append(log_entry)
+    csv_sink = get_connections_csv()
+    lead_index = get_lead_index()
+    for searched_role in roles:
+        lead_index.add_search(company.get("name", ""), searched_role)
 
-    # Load existing logs or create new list
-    logs = []
-    if os.path.exists(log_file):
-        try:
-            with open(log_file, "r") as f:
-                logs = json.load(f)
-        except json.JSONDecodeError:
-            logs = []
-
-    logs.append(log_entry)
-
-    # Save updated logs to JSON
-    with open(log_file, "w") as f:
-        json.dump(logs, f, indent=4)
-
-    # Parse the output to extract contacted people information
+    # Extract contacted people information from the (repaired) output
     try:
-        output_data = json.loads(output)
+        if not isinstance(output_data, dict):
+            raise TypeError("connection output is not a JSON object")
         contacts = output_data.get("people_contacted", [])
         messages = output_data.get("messages_sent", [])
+        roles_matched = output_data.get("roles_matched", [])
         connections_sent = output_data.get("connections_sent", 0)
 
-        # Define fieldnames for CSV
-        fieldnames = [
-            "timestamp",
-            "company_name",
-            "company_industry",
-            "company_location",
-            "role_searched",
-            "person_contacted",
-            "message_sent",
-            "goal_intent",
-        ]
-
-        # Write a row for each contacted person
+        # Write a row for each contacted person; the request was sent either way
+        rows = []
         if contacts:
             for i in range(len(contacts)):
+                if not lead_index.add_person(contacts[i], company.get("name", "")):
+                    print(f"↩️ {contacts[i]} had already been contacted at {company.get('name', 'Unknown')}")
                 message = messages[i] if i < len(messages) else ""
-                append_to_csv(
-                    csv_file,
+                matched_role = roles_matched[i] if i < len(roles_matched) else role
+                rows.append(
                     {
                         "timestamp": timestamp,
                         "company_name": company.get("name", "Unknown"),
                         "company_industry": company.get("industry", "Unknown"),
                         "company_location": company.get("location", "Unknown"),
-                        "role_searched": role,
+                        "role_searched": matched_role,
                         "person_contacted": contacts[i],
                         "message_sent": message,
                         "goal_intent": user_config["goal_intent"],
-                    },
-                    fieldnames,
+                    }
                 )
         elif connections_sent == 0:
             # Log that no connections were made for this company/role
-            append_to_csv(
-                csv_file,
+            rows.append(
                 {
                     "timestamp": timestamp,
                     "company_name": company.get("name", "Unknown"),
@@ -187,13 +550,16 @@ async def log_connection(company: dict, role: str, user_config: dict, output: st
                     "person_contacted": "None",
                     "message_sent": "None",
                     "goal_intent": user_config["goal_intent"],
-                },
-                fieldnames,
+                }
             )
+
+        csv_sink.write_rows(rows)
+        get_lead_store().add_connections(rows, region=user_config.get("region"))
     except (json.JSONDecodeError, AttributeError, TypeError) as e:
         print(f"Error processing connection output for CSV: {e}")
 
     print(f"📝 Connection logged for {role} at {company.get('name', 'Unknown')}")
+    return role_hits(roles, output_data)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Deduplication index for LeadSpot.
+
+Remembers which companies were already processed, which (company, role)
+searches were already run and which people were already contacted at each
+company, so later cycles can skip them before dispatching an agent.
+Membership checks are O(1) set lookups, with a trigram index catching
+near-duplicate company names; updates are appended to a JSONL file.
+"""
+import os
+import re
+
+from agents.normalization import CompanyIndex, canonical_company_name
+from agents.utils import iter_jsonl, open_jsonl_log, parse_json_lenient
+
+
+def normalize_role(role: str) -> str:
+    return " ".join((role or "").lower().split())
+
+
+def person_name(person: str) -> str:
+    """
+    Returns the name part of a contacted person entry such as
+    "Jane Doe - CMO", so the same person found through different roles
+    maps to the same name
+    """
+    name = re.split(r"\s+[-–|]\s+|,", person or "", maxsplit=1)[0]
+    return " ".join(name.split())
+
+
+class LeadIndex:
+    """
+    In-memory sets of processed companies, searched (company, role) pairs and
+    contacted (company, person) pairs, persisted as an append-only JSONL file.
+    """
+
+    def __init__(self, index_file: str = "data/logs/lead_index.jsonl"):
+        self.index_file = index_file
+        self.companies = set()
+        self.searches = set()
+        self.people = set()
+        # company key -> names of the people contacted there
+        self.contacts = {}
+        # Entries written before people were keyed by company
+        self.legacy_people = 0
+        self.company_index = CompanyIndex()
+
+        for entry in iter_jsonl(index_file):
+            # Re-canonicalize keys written by older normalization rules
+            entry_type, key = entry.get("type"), entry.get("key") or ""
+            if entry_type == "company":
+                key = self.company_index.add(key)
+            elif entry_type in ("search", "contact"):
+                company_key, _, rest = key.partition("|")
+                key = f"{self.company_index.add(company_key) or company_key}|{rest}"
+            elif entry_type == "person":
+                # Name-only hashes cannot tell namesakes at different companies apart
+                self.legacy_people += 1
+                continue
+            if self._add(entry_type, key) and entry_type == "contact":
+                self._add_contact(key, entry.get("name"))
+
+    @property
+    def exists(self):
+        return os.path.exists(self.index_file)
+
+    def company_key(self, company_name: str) -> str:
+        """
+        Returns the key of the known company a name refers to, or the
+        name's canonical form for a company not seen before
+        """
+        key = self.company_index.match(company_name)
+        return key or canonical_company_name(company_name)
+
+    def has_company(self, company_name: str) -> bool:
+        return self.company_key(company_name) in self.companies
+
+    def has_search(self, company_name: str, role: str) -> bool:
+        return self._search_key(company_name, role) in self.searches
+
+    def has_person(self, person: str, company_name: str) -> bool:
+        return self._person_key(person, company_name) in self.people
+
+    def contacted_at(self, company_name: str) -> list:
+        """
+        Returns the names of the people already contacted at a company
+        """
+        return self.contacts.get(self.company_key(company_name), [])
+
+    def add_company(self, company_name: str):
+        self._record("company", self.company_index.add(company_name))
+
+    def add_search(self, company_name: str, role: str):
+        self.add_company(company_name)
+        self._record("search", self._search_key(company_name, role))
+
+    def add_person(self, person: str, company_name: str) -> bool:
+        """
+        Adds a person contacted at a company, returning False if they were
+        already known
+        """
+        key = self._person_key(person, company_name)
+        if not key or key in self.people:
+            return False
+        self._record("contact", key, name=person_name(person))
+        self._add_contact(key, person_name(person))
+        return True
+
+    def build(self, connections, csv_rows=()):
+        """
+        Populates the index from logged connections and connection CSV rows.
+
+        Args:
+            connections: Iterable of connection log entries
+            csv_rows: Iterable of connections CSV rows as dictionaries
+        """
+        for entry in connections:
+            company_name = (entry.get("company") or {}).get("name", "")
+            if company_name:
+                roles = entry.get("roles_searched") or [entry.get("role_searched", "")]
+                for role in roles:
+                    self.add_search(company_name, role)
+                for person in _people_from_output(entry.get("output")):
+                    self.add_person(person, company_name)
+
+        for row in csv_rows:
+            if row.get("company_name"):
+                self.add_search(row["company_name"], row.get("role_searched", ""))
+            person = row.get("person_contacted")
+            if row.get("company_name") and person and person != "None":
+                self.add_person(person, row["company_name"])
+
+    def _search_key(self, company_name, role):
+        return f"{self.company_key(company_name)}|{normalize_role(role)}"
+
+    def _person_key(self, person, company_name):
+        name = person_name(person).lower()
+        return f"{self.company_key(company_name)}|{name}" if name else None
+
+    def _add_contact(self, key, name):
+        company_key, _, person_key = key.partition("|")
+        self.contacts.setdefault(company_key, []).append(name or person_key)
+
+    def _record(self, entry_type, key, **fields):
+        if not key or not self._add(entry_type, key):
+            return
+        open_jsonl_log(self.index_file).append({"type": entry_type, "key": key, **fields})
+
+    def _add(self, entry_type, key):
+        target = {
+            "company": self.companies,
+            "search": self.searches,
+            "contact": self.people,
+        }.get(entry_type)
+        if target is None or key in target:
+            return False
+        target.add(key)
+        return True
+
+
+def _people_from_output(output):
+    output = parse_json_lenient(output)
+    if not isinstance(output, dict):
+        return []
+    people = output.get("people_contacted") or []
+    return [person for person in people if isinstance(person, str)]
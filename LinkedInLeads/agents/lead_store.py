@@ -0,0 +1,440 @@
+#!/usr/bin/env python3
+"""
+Embedded lead store for LeadSpot.
+
+Keeps every scraped company and every logged connection from all
+campaigns in one indexed SQLite database, so questions like "which
+companies in Germany did we already contact for CMO roles" are a single
+query instead of re-parsing every timestamped data file.
+
+Query it from the LinkedInLeads directory:
+    python -m agents.lead_store connections --region germany --role CMO
+    python -m agents.lead_store companies --industry software
+    python -m agents.lead_store import
+"""
+import argparse
+import atexit
+import csv
+import glob
+import json
+import os
+import sqlite3
+from datetime import datetime
+
+from agents.normalization import canonical_company_name, normalize_company
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS companies (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    normalized_name TEXT NOT NULL,
+    industry TEXT,
+    location TEXT,
+    region TEXT,
+    follower_count TEXT,
+    companies_file TEXT NOT NULL,
+    scraped_at TEXT,
+    location_key TEXT,
+    UNIQUE (normalized_name, companies_file)
+);
+
+CREATE TABLE IF NOT EXISTS connections (
+    id INTEGER PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    company_name TEXT,
+    normalized_company TEXT,
+    company_industry TEXT,
+    company_location TEXT,
+    region TEXT,
+    role_searched TEXT,
+    person_contacted TEXT,
+    message_sent TEXT,
+    goal_intent TEXT,
+    location_key TEXT,
+    UNIQUE (timestamp, normalized_company, role_searched, person_contacted)
+);
+
+-- One row per role of a connection; batched searches log "a | b" labels
+CREATE TABLE IF NOT EXISTS connection_roles (
+    connection_id INTEGER NOT NULL,
+    role_key TEXT NOT NULL,
+    PRIMARY KEY (role_key, connection_id)
+);
+
+-- One row per entry of a campaign region such as "Germany, France"
+CREATE TABLE IF NOT EXISTS company_regions (
+    company_id INTEGER NOT NULL,
+    region_key TEXT NOT NULL,
+    PRIMARY KEY (region_key, company_id)
+);
+
+CREATE TABLE IF NOT EXISTS connection_regions (
+    connection_id INTEGER NOT NULL,
+    region_key TEXT NOT NULL,
+    PRIMARY KEY (region_key, connection_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_companies_name ON companies (normalized_name);
+CREATE INDEX IF NOT EXISTS idx_companies_location_key ON companies (location_key);
+CREATE INDEX IF NOT EXISTS idx_companies_scraped_at ON companies (scraped_at);
+CREATE INDEX IF NOT EXISTS idx_connections_company ON connections (normalized_company);
+CREATE INDEX IF NOT EXISTS idx_connections_location_key ON connections (location_key);
+CREATE INDEX IF NOT EXISTS idx_connections_timestamp ON connections (timestamp);
+"""
+
+CONNECTION_FIELDS = [
+    "timestamp",
+    "company_name",
+    "company_industry",
+    "company_location",
+    "role_searched",
+    "person_contacted",
+    "message_sent",
+    "goal_intent",
+]
+
+
+class LeadStore:
+    """
+    SQLite store of scraped companies and logged connections.
+    """
+
+    def __init__(self, db_path: str = "data/leads.db"):
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.db_path = db_path
+        self._conn = sqlite3.connect(db_path)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript(SCHEMA)
+
+    def add_companies(
+        self, companies: list, companies_file: str, region: str = None, scraped_at: str = None
+    ) -> int:
+        """
+        Stores the companies of one scrape, ignoring ones already stored for it
+        """
+        added = 0
+        with self._conn:
+            for company in map(normalize_company, companies):
+                if not company["name"]:
+                    continue
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO companies (name, normalized_name, industry, "
+                    "location, region, follower_count, companies_file, scraped_at, "
+                    "location_key) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        company["name"],
+                        canonical_company_name(company["name"]),
+                        company.get("industry"),
+                        company.get("location"),
+                        region,
+                        _text(company.get("follower_count")),
+                        companies_file,
+                        iso_timestamp(scraped_at),
+                        location_key(company.get("location")),
+                    ),
+                )
+                if cursor.rowcount:
+                    added += 1
+                    self._add_keys(
+                        "company_regions", ("company_id", "region_key"),
+                        cursor.lastrowid, region_keys(region),
+                    )
+        return added
+
+    def add_connections(self, rows: list, region: str = None) -> int:
+        """
+        Stores connection rows shaped like the connections CSV
+        """
+        added = 0
+        with self._conn:
+            for row in rows:
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO connections (timestamp, company_name, "
+                    "normalized_company, company_industry, company_location, region, "
+                    "role_searched, person_contacted, message_sent, goal_intent, "
+                    "location_key) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        row.get("timestamp"),
+                        row.get("company_name"),
+                        canonical_company_name(row.get("company_name", "")),
+                        row.get("company_industry"),
+                        row.get("company_location"),
+                        region,
+                        row.get("role_searched"),
+                        row.get("person_contacted"),
+                        row.get("message_sent"),
+                        row.get("goal_intent"),
+                        location_key(row.get("company_location")),
+                    ),
+                )
+                if cursor.rowcount:
+                    added += 1
+                    self._add_keys(
+                        "connection_roles", ("connection_id", "role_key"), cursor.lastrowid,
+                        role_keys(row.get("role_searched")),
+                    )
+                    self._add_keys(
+                        "connection_regions", ("connection_id", "region_key"), cursor.lastrowid,
+                        region_keys(region),
+                    )
+        return added
+
+    def query_connections(
+        self,
+        company: str = None,
+        role: str = None,
+        region: str = None,
+        since: str = None,
+        until: str = None,
+        contacted_only: bool = False,
+        limit: int = None,
+    ) -> list:
+        """
+        Returns connection rows matching every given filter.
+        Role and region match whole values, ignoring case and spacing; region
+        matches either an entry of the campaign region or the company's
+        country (the last part of its location).
+        """
+        clauses, params = [], []
+        if company:
+            clauses.append("normalized_company = ?")
+            params.append(canonical_company_name(company))
+        if role:
+            clauses.append("id IN (SELECT connection_id FROM connection_roles WHERE role_key = ?)")
+            params.append(tag_key(role))
+        if region:
+            clauses.append(
+                "(id IN (SELECT connection_id FROM connection_regions WHERE region_key = ?) "
+                "OR location_key = ?)"
+            )
+            params.extend([tag_key(region), tag_key(region)])
+        if since:
+            clauses.append("timestamp >= ?")
+            params.append(since)
+        if until:
+            clauses.append("timestamp < ?")
+            params.append(until)
+        if contacted_only:
+            clauses.append("person_contacted IS NOT NULL AND person_contacted != 'None'")
+        return self._select("connections", clauses, params, "timestamp", limit)
+
+    def query_companies(
+        self,
+        name: str = None,
+        industry: str = None,
+        region: str = None,
+        since: str = None,
+        limit: int = None,
+    ) -> list:
+        """
+        Returns stored companies matching every given filter; region
+        matches like in query_connections
+        """
+        clauses, params = [], []
+        if name:
+            clauses.append("normalized_name = ?")
+            params.append(canonical_company_name(name))
+        if industry:
+            clauses.append("industry LIKE ?")
+            params.append(f"%{industry}%")
+        if region:
+            clauses.append(
+                "(id IN (SELECT company_id FROM company_regions WHERE region_key = ?) "
+                "OR location_key = ?)"
+            )
+            params.extend([tag_key(region), tag_key(region)])
+        if since:
+            clauses.append("scraped_at >= ?")
+            params.append(since)
+        return self._select("companies", clauses, params, "scraped_at", limit)
+
+    def import_files(self, companies_directory: str, connections_csv: str) -> tuple:
+        """
+        Backfills the store from existing companies JSON files and the
+        connections CSV
+
+        Returns:
+            (companies added, connections added)
+        """
+        companies_added = 0
+        for companies_file in sorted(glob.glob(os.path.join(companies_directory, "*.json"))):
+            try:
+                with open(companies_file, "r") as f:
+                    data = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                continue
+            companies = data.get("companies") if isinstance(data, dict) else None
+            if not isinstance(companies, list):
+                continue
+            user_config = data.get("user_config") or {}
+            companies_added += self.add_companies(
+                companies, companies_file, user_config.get("region"), data.get("scraped_at")
+            )
+
+        connections_added = 0
+        if os.path.exists(connections_csv):
+            with open(connections_csv, "r", newline="") as f:
+                rows = [
+                    row
+                    for row in csv.DictReader(f, fieldnames=CONNECTION_FIELDS)
+                    if row.get("timestamp") != "timestamp"
+                ]
+            connections_added = self.add_connections(rows)
+
+        return companies_added, connections_added
+
+    def close(self):
+        self._conn.close()
+
+    def _add_keys(self, table, columns, row_id, keys):
+        self._conn.executemany(
+            f"INSERT OR IGNORE INTO {table} ({', '.join(columns)}) VALUES (?, ?)",
+            [(row_id, key) for key in keys],
+        )
+
+    def _select(self, table, clauses, params, order_by, limit):
+        sql = f"SELECT * FROM {table}"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += f" ORDER BY {order_by} DESC"
+        if limit:
+            sql += " LIMIT ?"
+            params = params + [limit]
+        return [dict(row) for row in self._conn.execute(sql, params)]
+
+
+def _text(value):
+    return None if value is None else str(value)
+
+
+def tag_key(value) -> str:
+    """
+    Normalizes a role or region for exact, indexed lookups
+    """
+    return " ".join(str(value).casefold().split()) if value else None
+
+
+def location_key(location) -> str:
+    """
+    Returns the country part of a location such as "Berlin, Germany"
+    """
+    return tag_key(str(location).split(",")[-1]) if location else None
+
+
+def role_keys(role_searched) -> list:
+    """
+    Splits a batched "a | b" role label into its role keys
+    """
+    return [key for key in map(tag_key, str(role_searched or "").split("|")) if key]
+
+
+def region_keys(region) -> list:
+    """
+    Splits a campaign region such as "Germany, Europe" into its region keys
+    """
+    return [key for key in map(tag_key, str(region or "").split(",")) if key]
+
+
+def iso_timestamp(value):
+    """
+    Converts the scraper's %Y%m%d_%H%M%S file timestamps to ISO format
+    """
+    try:
+        return datetime.strptime(value, "%Y%m%d_%H%M%S").isoformat()
+    except (TypeError, ValueError):
+        return value
+
+
+_lead_store = None
+
+
+def get_lead_store(db_path: str = "data/leads.db") -> LeadStore:
+    """
+    Returns the process-wide lead store, opening it on first use
+    """
+    global _lead_store
+    if _lead_store is None:
+        _lead_store = LeadStore(db_path)
+        atexit.register(_lead_store.close)
+    return _lead_store
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the LeadSpot lead store")
+    parser.add_argument("--db", default="data/leads.db")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    connections_parser = subparsers.add_parser("connections", help="Query logged connections")
+    connections_parser.add_argument("--company")
+    connections_parser.add_argument("--role")
+    connections_parser.add_argument("--region")
+    connections_parser.add_argument("--since", help="ISO timestamp lower bound")
+    connections_parser.add_argument("--until", help="ISO timestamp upper bound")
+    connections_parser.add_argument("--contacted-only", action="store_true")
+    connections_parser.add_argument("--limit", type=int)
+    connections_parser.add_argument("--companies", action="store_true", help="Only list distinct companies")
+
+    companies_parser = subparsers.add_parser("companies", help="Query scraped companies")
+    companies_parser.add_argument("--name")
+    companies_parser.add_argument("--industry")
+    companies_parser.add_argument("--region")
+    companies_parser.add_argument("--since")
+    companies_parser.add_argument("--limit", type=int)
+
+    import_parser = subparsers.add_parser("import", help="Backfill from existing data files")
+    import_parser.add_argument("--companies-dir", default="data/companies")
+    import_parser.add_argument("--connections-csv", default="data/logs/connections.csv")
+
+    args = parser.parse_args()
+    store = LeadStore(args.db)
+
+    if args.command == "import":
+        companies_added, connections_added = store.import_files(
+            args.companies_dir, args.connections_csv
+        )
+        print(f"Imported {companies_added} companies and {connections_added} connections")
+    elif args.command == "connections":
+        rows = store.query_connections(
+            company=args.company,
+            role=args.role,
+            region=args.region,
+            since=args.since,
+            until=args.until,
+            contacted_only=args.contacted_only,
+            limit=args.limit,
+        )
+        if args.companies:
+            for name in dict.fromkeys(row["company_name"] for row in rows):
+                print(name)
+        else:
+            for row in rows:
+                print(
+                    f"{row['timestamp']}  {row['company_name']}  [{row['role_searched']}]  "
+                    f"{row['person_contacted']}"
+                )
+        print(f"{len(rows)} rows")
+    else:
+        rows = store.query_companies(
+            name=args.name,
+            industry=args.industry,
+            region=args.region,
+            since=args.since,
+            limit=args.limit,
+        )
+        for row in rows:
+            print(
+                f"{row['scraped_at']}  {row['name']}  ({row['industry']}, {row['location']})  "
+                f"followers: {row['follower_count']}"
+            )
+        print(f"{len(rows)} rows")
+
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Campaign metrics for LeadSpot.
+
+Every lead connector task records its device, role, agent steps, wall
+time, LLM calls, latency and tokens and the connections it sent to
+data/logs/metrics.jsonl. LLM calls are captured through the llama-index
+instrumentation dispatcher and attributed to the task running them.
+
+Report on past campaigns from the LinkedInLeads directory:
+    python -m agents.metrics
+    python -m agents.metrics --since 2025-01-01 --html data/logs/metrics.html
+"""
+import argparse
+import html
+import os
+import time
+from contextvars import ContextVar
+from datetime import datetime
+
+from agents.utils import iter_jsonl, open_jsonl_log
+
+METRICS_LOG = "data/logs/metrics.jsonl"
+REPORT_GROUPS = [("device", "Device"), ("role", "Role"), ("hour", "Hour")]
+
+_current_task = ContextVar("current_task", default=None)
+
+
+class TaskMetrics:
+    """
+    Counters for one agent task, filled in while it runs.
+    """
+
+    def __init__(self, **fields):
+        self.fields = dict(fields)
+        self.started_at = datetime.now().isoformat(timespec="seconds")
+        self.steps = None
+        self.success = False
+        self.aborted = False
+        self.connections = 0
+        self.wait_time = 0.0
+        self.llm_calls = 0
+        self.llm_latency = 0.0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.total_tokens = 0
+        self.error = None
+        self._start = time.monotonic()
+        self._token = None
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self._start
+
+    def add_llm_call(self, latency: float, usage: dict):
+        self.llm_calls += 1
+        self.llm_latency += latency
+        self.prompt_tokens += usage.get("prompt_tokens", 0)
+        self.completion_tokens += usage.get("completion_tokens", 0)
+        self.total_tokens += usage.get("total_tokens", 0)
+
+    def to_dict(self) -> dict:
+        return dict(
+            self.fields,
+            started_at=self.started_at,
+            wall_time=round(self.elapsed(), 2),
+            wait_time=round(self.wait_time, 2),
+            steps=self.steps,
+            success=self.success,
+            aborted=self.aborted,
+            connections=self.connections,
+            llm_calls=self.llm_calls,
+            llm_latency=round(self.llm_latency, 2),
+            prompt_tokens=self.prompt_tokens,
+            completion_tokens=self.completion_tokens,
+            total_tokens=self.total_tokens,
+            error=self.error,
+        )
+
+
+def start_task(**fields) -> TaskMetrics:
+    """
+    Starts timing a task; LLM calls made from the current asyncio task
+    (and the tasks it spawns) are attributed to it until finish_task
+    """
+    task = TaskMetrics(**fields)
+    task._token = _current_task.set(task)
+    return task
+
+
+def finish_task(task: TaskMetrics, metrics_file: str = METRICS_LOG) -> dict:
+    """
+    Stops a task and appends its metrics to the metrics log
+    """
+    if task._token is not None:
+        _current_task.reset(task._token)
+        task._token = None
+    record = task.to_dict()
+    open_jsonl_log(metrics_file).append(record)
+    return record
+
+
+def _token_usage(response) -> dict:
+    """
+    Reads token counts from a llama-index LLM response, whichever usage
+    format the provider reports
+    """
+    usage = {}
+    for source in (getattr(response, "raw", None), getattr(response, "additional_kwargs", None)):
+        if hasattr(source, "model_dump"):
+            source = source.model_dump()
+        if not isinstance(source, dict):
+            continue
+        usage = source.get("usage_metadata") or source.get("usage") or source
+        if hasattr(usage, "model_dump"):
+            usage = usage.model_dump()
+        if isinstance(usage, dict) and any("token" in key for key in usage):
+            break
+        usage = {}
+
+    prompt = usage.get("prompt_token_count", usage.get("prompt_tokens")) or 0
+    completion = usage.get("candidates_token_count", usage.get("completion_tokens")) or 0
+    total = usage.get("total_token_count", usage.get("total_tokens")) or prompt + completion
+    return {"prompt_tokens": prompt, "completion_tokens": completion, "total_tokens": total}
+
+
+_instrumented = False
+
+
+def install_llm_instrumentation():
+    """
+    Registers a handler on the root llama-index dispatcher that times LLM
+    calls and reads their token usage. Safe to call more than once.
+    """
+    global _instrumented
+    if _instrumented:
+        return
+
+    from llama_index.core.instrumentation import get_dispatcher
+    from llama_index.core.instrumentation.event_handlers import BaseEventHandler
+    from llama_index.core.instrumentation.events.llm import (
+        LLMChatEndEvent,
+        LLMChatStartEvent,
+        LLMCompletionEndEvent,
+        LLMCompletionStartEvent,
+    )
+
+    starts = {}
+
+    class LLMMetricsHandler(BaseEventHandler):
+        @classmethod
+        def class_name(cls) -> str:
+            return "LLMMetricsHandler"
+
+        def handle(self, event, **kwargs):
+            if isinstance(event, (LLMChatStartEvent, LLMCompletionStartEvent)):
+                starts[event.span_id] = time.monotonic()
+            elif isinstance(event, (LLMChatEndEvent, LLMCompletionEndEvent)):
+                started = starts.pop(event.span_id, None)
+                task = _current_task.get()
+                if task is not None and started is not None:
+                    task.add_llm_call(time.monotonic() - started, _token_usage(event.response))
+
+    get_dispatcher().add_event_handler(LLMMetricsHandler())
+    _instrumented = True
+
+
+def load_metrics(metrics_file: str = METRICS_LOG, since: str = None) -> list:
+    return [
+        record
+        for record in iter_jsonl(metrics_file)
+        if not since or (record.get("started_at") or "") >= since
+    ]
+
+
+def aggregate(records: list, key: str) -> list:
+    """
+    Sums task metrics per value of ``key`` ("device", "role" or "hour")
+
+    Returns:
+        One row per group, busiest group first
+    """
+    groups = {}
+    for record in records:
+        if key == "hour":
+            started_at = record.get("started_at") or ""
+            group = f"{started_at[:10]} {started_at[11:13]}:00" if started_at else None
+        else:
+            group = record.get(key)
+        row = groups.setdefault(
+            group or "unknown",
+            {"tasks": 0, "successes": 0, "aborted": 0, "connections": 0, "steps": 0,
+             "wall_time": 0.0, "llm_calls": 0, "llm_latency": 0.0, "tokens": 0},
+        )
+        row["tasks"] += 1
+        row["successes"] += int(bool(record.get("success")))
+        row["aborted"] += int(bool(record.get("aborted")))
+        row["connections"] += record.get("connections") or 0
+        row["steps"] += record.get("steps") or 0
+        row["wall_time"] += record.get("wall_time") or 0.0
+        row["llm_calls"] += record.get("llm_calls") or 0
+        row["llm_latency"] += record.get("llm_latency") or 0.0
+        row["tokens"] += record.get("total_tokens") or 0
+
+    rows = []
+    for group, row in groups.items():
+        hours = row["wall_time"] / 3600
+        rows.append(
+            dict(
+                row,
+                group=group,
+                success_rate=row["successes"] / row["tasks"],
+                avg_steps=row["steps"] / row["tasks"],
+                avg_wall_time=row["wall_time"] / row["tasks"],
+                avg_llm_latency=row["llm_latency"] / row["llm_calls"] if row["llm_calls"] else 0.0,
+                llm_share=row["llm_latency"] / row["wall_time"] if row["wall_time"] else 0.0,
+                connections_per_hour=row["connections"] / hours if hours else 0.0,
+            )
+        )
+    if key == "hour":
+        return sorted(rows, key=lambda row: row["group"])
+    return sorted(rows, key=lambda row: row["wall_time"], reverse=True)
+
+
+REPORT_COLUMNS = [
+    ("Tasks", lambda row: str(row["tasks"])),
+    ("Success", lambda row: f"{row['success_rate']:.0%}"),
+    ("Stopped", lambda row: str(row["aborted"])),
+    ("Connections", lambda row: str(row["connections"])),
+    ("Conn/h", lambda row: f"{row['connections_per_hour']:.1f}"),
+    ("Avg steps", lambda row: f"{row['avg_steps']:.1f}"),
+    ("Avg time", lambda row: f"{row['avg_wall_time']:.0f}s"),
+    ("LLM calls", lambda row: str(row["llm_calls"])),
+    ("LLM latency", lambda row: f"{row['avg_llm_latency']:.1f}s"),
+    ("LLM share", lambda row: f"{row['llm_share']:.0%}"),
+    ("Tokens", lambda row: str(row["tokens"])),
+]
+
+
+def print_report(records: list):
+    """
+    Prints throughput per device, per role and per hour
+    """
+    if not records:
+        print("No task metrics recorded yet")
+        return
+
+    for key, title in REPORT_GROUPS:
+        rows = aggregate(records, key)
+        width = max(len(title), *(len(str(row["group"])) for row in rows))
+        print(f"\n📊 Throughput per {title.lower()}")
+        print(f"{title:<{width}}  " + "  ".join(f"{name:>11}" for name, _ in REPORT_COLUMNS))
+        for row in rows:
+            print(
+                f"{str(row['group']):<{width}}  "
+                + "  ".join(f"{value(row):>11}" for _, value in REPORT_COLUMNS)
+            )
+
+
+def write_html_report(records: list, html_file: str):
+    """
+    Writes the per device, per role and per hour tables as an HTML page
+    """
+    sections = []
+    for key, title in REPORT_GROUPS:
+        header = "".join(f"<th>{name}</th>" for name, _ in [(title, None)] + REPORT_COLUMNS)
+        body = "".join(
+            "<tr><td>"
+            + html.escape(str(row["group"]))
+            + "</td>"
+            + "".join(f"<td>{value(row)}</td>" for _, value in REPORT_COLUMNS)
+            + "</tr>"
+            for row in aggregate(records, key)
+        )
+        sections.append(
+            f"<h2>Throughput per {title.lower()}</h2><table><tr>{header}</tr>{body}</table>"
+        )
+
+    directory = os.path.dirname(html_file)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(html_file, "w") as f:
+        f.write(
+            "<!DOCTYPE html><html><head><meta charset='utf-8'><title>LeadSpot metrics</title>"
+            "<style>body{font-family:sans-serif}table{border-collapse:collapse}"
+            "td,th{border:1px solid #ccc;padding:4px 8px;text-align:right}"
+            "td:first-child,th:first-child{text-align:left}</style></head><body>"
+            f"<h1>LeadSpot campaign metrics</h1><p>{len(records)} tasks</p>"
+            + "".join(sections)
+            + "</body></html>"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report LeadSpot campaign metrics")
+    parser.add_argument("--metrics-file", default=METRICS_LOG)
+    parser.add_argument("--since", help="ISO timestamp lower bound")
+    parser.add_argument("--html", help="Also write an HTML report to this path")
+    args = parser.parse_args()
+
+    records = load_metrics(args.metrics_file, args.since)
+    print_report(records)
+    if args.html and records:
+        write_html_report(records, args.html)
+        print(f"\nHTML report saved to {args.html}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Company normalization for LeadSpot.
+
+Scraped companies come back with inconsistent names ("Acme, Inc.",
+"ACME Inc", "Acme") and follower formats ("196K", "1.2M followers",
+12000). This module maps names to a canonical form, parses follower
+counts to integers and keeps a trigram index so near-duplicate
+companies across scrape files can be merged before any agent is run.
+"""
+import re
+import unicodedata
+from collections import Counter
+
+# Trailing tokens that don't distinguish one company from another
+LEGAL_SUFFIXES = {
+    "ab", "ag", "as", "bv", "co", "company", "corp", "corporation", "ev",
+    "gmbh", "haftungsbeschrankt", "inc", "incorporated", "kg", "kgaa",
+    "limited", "llc", "llp", "lp", "ltd", "mbh", "nv", "oy", "plc", "pte",
+    "pty", "pvt", "private", "sa", "sarl", "sas", "se", "spa", "srl", "ug",
+    "and",
+}
+
+FOLLOWER_MULTIPLIERS = {"k": 1_000, "m": 1_000_000, "b": 1_000_000_000}
+
+
+def canonical_company_name(name: str) -> str:
+    """
+    Returns the canonical form of a company name: accents, case,
+    punctuation, "&" and legal suffixes such as "Inc." or "GmbH" removed
+    """
+    name = unicodedata.normalize("NFKD", name or "")
+    name = "".join(char for char in name if not unicodedata.combining(char))
+    # Drop dots so "S.A." and "Inc." read as "sa" and "inc"
+    name = name.lower().replace("&", " and ").replace(".", "")
+    tokens = re.sub(r"[^\w\s]", " ", name).split()
+
+    # Drop the article first, so "The Company" keeps "company"
+    if len(tokens) > 1 and tokens[0] == "the":
+        tokens.pop(0)
+    # Keep at least one token so the name doesn't vanish
+    while len(tokens) > 1 and tokens[-1] in LEGAL_SUFFIXES:
+        tokens.pop()
+    return " ".join(tokens)
+
+
+def parse_follower_count(value):
+    """
+    Parses follower counts like 12000, "12,000", "196K" or "1.2M followers"
+    to an integer, returning None if no count can be read
+    """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    if not isinstance(value, str):
+        return None
+
+    match = re.search(r"(\d[\d,.\s]*)\s*([kmb])?\b", value.lower())
+    if not match:
+        return None
+    number, unit = match.group(1).replace(" ", ""), match.group(2)
+    if unit and number.count(",") == 1 and "." not in number:
+        # "1,2K" uses a decimal comma
+        number = number.replace(",", ".")
+    elif unit:
+        number = number.replace(",", "")
+    else:
+        number = number.replace(",", "").replace(".", "")
+    try:
+        return int(float(number) * FOLLOWER_MULTIPLIERS.get(unit, 1))
+    except ValueError:
+        return None
+
+
+def normalize_company(company: dict) -> dict:
+    """
+    Returns a copy of a scraped company with a tidied display name and an
+    integer follower_count (read from "follower_count" or "followers")
+    """
+    company = dict(company)
+    company["name"] = " ".join(str(company.get("name") or "").split())
+
+    followers = company.pop("followers", None)
+    raw_count = company.get("follower_count")
+    if raw_count is None or raw_count == "":
+        raw_count = followers
+    follower_count = parse_follower_count(raw_count)
+    company["follower_count"] = follower_count if follower_count is not None else raw_count
+    return company
+
+
+def trigrams(text: str) -> set:
+    padded = f"  {text} "
+    return {padded[index:index + 3] for index in range(len(padded) - 2)}
+
+
+class CompanyIndex:
+    """
+    Fuzzy index of canonical company names.
+
+    Exact canonical matches are a dictionary lookup; otherwise candidates
+    sharing trigrams with the name are scored by trigram Jaccard
+    similarity, touching only the postings of the name's own trigrams.
+    """
+
+    def __init__(self, threshold: float = 0.7):
+        self.threshold = threshold
+        self._keys = set()
+        self._trigram_keys = {}
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, name):
+        return self.match(name) is not None
+
+    def match(self, name: str):
+        """
+        Returns the canonical key of the indexed company matching ``name``,
+        or None if there is no close enough match
+        """
+        key = canonical_company_name(name)
+        if not key or key in self._keys:
+            return key or None
+
+        grams = trigrams(key)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self._trigram_keys.get(gram, ()))
+
+        best_key, best_score = None, self.threshold
+        for candidate, overlap in shared.items():
+            score = overlap / (len(grams) + len(trigrams(candidate)) - overlap)
+            if score >= best_score:
+                best_key, best_score = candidate, score
+        return best_key
+
+    def add(self, name: str):
+        """
+        Indexes a company, returning the key of the company it was merged
+        into (or its own canonical key if it is new)
+        """
+        key = self.match(name)
+        if key is not None:
+            return key
+
+        key = canonical_company_name(name)
+        if not key:
+            return None
+        self._keys.add(key)
+        for gram in trigrams(key):
+            self._trigram_keys.setdefault(gram, set()).add(key)
+        return key
+
+
+def merge_companies(companies, index: CompanyIndex = None) -> list:
+    """
+    Normalizes companies and merges duplicates, keeping the first name
+    seen and filling fields it lacks from later duplicates.
+
+    Args:
+        companies: Iterable of scraped company dictionaries
+        index: Optional CompanyIndex shared across calls
+
+    Returns:
+        Merged companies in first-seen order
+    """
+    index = index if index is not None else CompanyIndex()
+    merged = {}
+    for company in companies:
+        company = normalize_company(company)
+        key = index.add(company["name"])
+        if key is None:
+            continue
+        existing = merged.get(key)
+        if existing is None:
+            merged[key] = company
+            continue
+        for field, value in company.items():
+            if existing.get(field) in (None, ""):
+                existing[field] = value
+    return list(merged.values())
@@ -38,12 +38,27 @@ Output only the JSON string, do not include any other text.
 """
 
 
+def KNOWN_CONTACTS(known_contacts: list):
+    """
+    Lists people already contacted at the company, who must not get
+    another request
+    """
+    if not known_contacts:
+        return ""
+    lines = "\n".join(f"- {name}" for name in known_contacts)
+    return f"""
+Already contacted at this company (skip these people, do not send them another request):
+{lines}
+"""
+
+
 def LEAD_CONNECTOR_GOAL(
     company_name: str,
     role_title: str,
     goal_intent: str,
     about_yourself: str,
     user_config: dict,
+    known_contacts: list = None,
 ):
     """
     Prompt for connecting with specific roles at a company
@@ -89,4 +104,63 @@ Return a brief summary of connections made in JSON format:
   "people_contacted": ["name and role"],
   "messages_sent": ["sample message used"]
 }}
-"""
+""" + KNOWN_CONTACTS(known_contacts)
+
+
+def LEAD_CONNECTOR_BATCH_GOAL(
+    company_name: str,
+    role_titles: list,
+    goal_intent: str,
+    about_yourself: str,
+    user_config: dict,
+    known_contacts: list = None,
+):
+    """
+    Prompt for connecting with all target roles at a company in one session
+    """
+    roles = "\n".join(f"   - {role_title}" for role_title in role_titles)
+    return f"""
+You are a LinkedIn networking agent focused on making authentic connections for business purposes.
+
+Your Mission:
+- Company: {company_name}
+- Target Roles (any of):
+{roles}
+- Goal: {goal_intent}
+- Your Background: {about_yourself}
+
+Instructions:
+0. Go back to home page of linkedin app and use the search bar at the top to search for people.
+1. Search LinkedIn for: "{company_name}" and filter the results to people.
+2. Look through the search results to find people who:
+   - Actually work at {company_name} (verify the company name in their profile)
+   - Have a role title matching or similar to any of the target roles above
+    If the top results contain nobody relevant, search again for "<role> at {company_name}" for the most senior target roles only.
+    No need to scroll, if you can't find any relevant person just return {{connections_sent:0}}
+3. For each relevant person found:
+   - Send a connection request
+   - Add a personalized message that:
+     * Mentions their role at {company_name}
+     * Briefly explains who you are: {about_yourself}
+     * States your goal clearly: {goal_intent}
+     * Keeps it professional and authentic (under 200 characters)
+
+4. Example message template:
+   "Hi [Name], I saw your [Role] role at {company_name}. {about_yourself}. I'd love to connect and discuss {goal_intent}. Best, [Your Name]"
+
+5. If you can't find any person in the company, just return {{connections_sent:0}}
+
+Important:
+- Only connect with people who actually work at {company_name}
+- Do not send more than one request to the same person
+- Personalize each message - don't send generic requests
+- Be respectful and professional
+
+Return a brief summary of connections made in JSON format, with one entry per person in each list:
+{{
+  "connections_sent": number,
+  "people_contacted": ["name and role"],
+  "roles_matched": ["target role from the list above that the person matched"],
+  "messages_sent": ["message sent to the person"]
+}}
+""" + KNOWN_CONTACTS(known_contacts)
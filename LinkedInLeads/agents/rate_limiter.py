@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Adaptive rate limiting for LeadSpot agent runs.
+
+Each limiter enforces a cool-down of 60 / rate seconds after every run
+finishes (and between run starts, for limiters shared by several
+devices). The rate is tuned with AIMD (additive increase, multiplicative
+decrease): quick successful runs raise it step by step, while failures,
+throttling or step-count spikes cut it sharply, lengthening the pause.
+Limiters are kept per device and per account.
+"""
+import asyncio
+import time
+from collections import deque
+from statistics import median
+
+THROTTLE_HINTS = ("limit", "try again later", "too many", "restricted")
+
+
+class AdaptiveRateLimiter:
+    """
+    AIMD-tuned cool-down between runs. Rates are in agent runs per minute.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rate: float = 30.0,
+        min_rate: float = 2.0,
+        max_rate: float = 60.0,
+        increase: float = 2.0,
+        decrease: float = 0.5,
+        window: int = 10,
+        max_failure_rate: float = 0.3,
+        step_spike: float = 1.5,
+    ):
+        self.name = name
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.max_failure_rate = max_failure_rate
+        self.step_spike = step_spike
+
+        # Earliest time the next run may start
+        self._ready_at = time.monotonic()
+        self._lock = asyncio.Lock()
+        self._outcomes = deque(maxlen=window)
+        self._success_steps = deque(maxlen=window)
+
+    @property
+    def failure_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return self._outcomes.count(False) / len(self._outcomes)
+
+    @property
+    def interval(self) -> float:
+        return 60 / self.rate
+
+    async def acquire(self):
+        """
+        Waits until the cool-down after the previous run has passed
+        """
+        async with self._lock:
+            delay = self._ready_at - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            # Also spaces out starts when several devices share the limiter
+            self._ready_at = time.monotonic() + self.interval
+
+    def cool_down(self):
+        """
+        Starts the pause before the next run from the end of this one
+        """
+        self._ready_at = max(self._ready_at, time.monotonic() + self.interval)
+
+    def record(self, success: bool, steps: int = None, reason: str = None):
+        """
+        Adjusts the rate from the outcome of an agent run.
+
+        Args:
+            success: Whether the run succeeded
+            steps: Number of agent steps the run took
+            reason: Result reason, checked for throttling hints
+        """
+        self._outcomes.append(bool(success))
+
+        throttled = bool(reason) and any(
+            hint in reason.lower() for hint in THROTTLE_HINTS
+        )
+        spiked = bool(
+            steps
+            and self._success_steps
+            and steps > median(self._success_steps) * self.step_spike
+        )
+        if success and steps:
+            self._success_steps.append(steps)
+
+        if (
+            not success
+            or throttled
+            or spiked
+            or self.failure_rate > self.max_failure_rate
+        ):
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+        else:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+        # Applied after the rate change, so backing off slows the next run
+        self.cool_down()
+
+    def metrics(self) -> dict:
+        return {
+            "limiter": self.name,
+            "rate_per_minute": round(self.rate, 2),
+            "failure_rate": round(self.failure_rate, 2),
+            "median_success_steps": (
+                median(self._success_steps) if self._success_steps else None
+            ),
+        }
+
+
+_limiters = {}
+
+
+def get_rate_limiter(key: str, **kwargs) -> AdaptiveRateLimiter:
+    """
+    Returns the shared limiter for a key such as "device:<serial>" or
+    "account:<name>", creating it with ``kwargs`` on first use
+    """
+    limiter = _limiters.get(key)
+    if limiter is None:
+        limiter = AdaptiveRateLimiter(key, **kwargs)
+        _limiters[key] = limiter
+    return limiter
+
+
+def rate_metrics() -> list:
+    """Returns the current metrics of every limiter."""
+    return [limiter.metrics() for limiter in _limiters.values()]
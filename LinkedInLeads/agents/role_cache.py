@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Persistent cache for LLM role expansions.
+
+Entries are keyed by the model name and the normalized, sorted set of
+input role keywords, expire after a TTL and are evicted least recently
+used first once the cache is full.
+"""
+import os
+import json
+import time
+from collections import OrderedDict
+
+
+def cache_key(role_keywords: list, model: str) -> str:
+    """
+    Builds a cache key that ignores keyword order, case, whitespace and duplicates
+    """
+    keywords = sorted({" ".join(keyword.lower().split()) for keyword in role_keywords})
+    return json.dumps([model, [keyword for keyword in keywords if keyword]])
+
+
+class RoleCache:
+    """
+    JSON-file backed TTL + LRU cache of expanded roles.
+    """
+
+    def __init__(
+        self,
+        cache_file: str = "data/cache/role_cache.json",
+        ttl: float = 7 * 24 * 60 * 60,
+        max_entries: int = 100,
+    ):
+        self.cache_file = cache_file
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+        if os.path.exists(cache_file):
+            try:
+                with open(cache_file, "r") as f:
+                    entries = json.load(f)
+                # Stored least recently used first
+                for entry in entries:
+                    self._entries[entry["key"]] = entry
+            except (json.JSONDecodeError, KeyError, TypeError):
+                self._entries.clear()
+
+    def get(self, role_keywords: list, model: str):
+        """
+        Returns the cached expanded roles, or None on a miss or expired entry
+        """
+        key = cache_key(role_keywords, model)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.time() - entry["created_at"] > self.ttl:
+            del self._entries[key]
+            self._save()
+            return None
+
+        self._entries.move_to_end(key)
+        return list(entry["expanded_roles"])
+
+    def put(
+        self, role_keywords: list, model: str, expanded_roles: list, created_at: float = None
+    ):
+        key = cache_key(role_keywords, model)
+        self._entries[key] = {
+            "key": key,
+            "role_keywords": list(role_keywords),
+            "model": model,
+            "expanded_roles": list(expanded_roles),
+            "created_at": created_at or time.time(),
+        }
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        self._save()
+
+    def prewarm(self, generated_roles_file: str, model: str) -> bool:
+        """
+        Seeds the cache from a file written by save_generated_roles.
+        The entry is dated by the file's modification time, so an old file
+        cannot bring back an expired expansion.
+
+        Args:
+            generated_roles_file: Path to the generated roles JSON file
+            model: Model the stored roles were generated with
+
+        Returns:
+            True if an entry was added
+        """
+        try:
+            created_at = os.path.getmtime(generated_roles_file)
+            with open(generated_roles_file, "r") as f:
+                role_data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return False
+        if time.time() - created_at > self.ttl:
+            return False
+
+        original_roles = role_data.get("original_roles") or []
+        expanded_roles = role_data.get("expanded_roles") or []
+        if not original_roles or not expanded_roles:
+            return False
+        if self.get(original_roles, model) is not None:
+            return False
+
+        self.put(original_roles, model, expanded_roles, created_at=created_at)
+        return True
+
+    def _save(self):
+        directory = os.path.dirname(self.cache_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        temp_file = self.cache_file + ".tmp"
+        with open(temp_file, "w") as f:
+            json.dump(list(self._entries.values()), f, indent=4)
+        os.replace(temp_file, self.cache_file)
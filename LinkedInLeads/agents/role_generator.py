@@ -1,22 +1,44 @@
 #!/usr/bin/env python3
 import asyncio
 import os
-from llama_index.llms.google_genai import GoogleGenAI
+from agents.llm_pool import get_llm
 from dotenv import load_dotenv
+from agents.role_cache import RoleCache
 import json
 
 load_dotenv()
 
+GENERATED_ROLES_FILE = "data/generated_roles.json"
 
-async def generate_roles(role_keywords: list) -> list:
+_role_cache = None
+
+
+def get_role_cache():
     """
-    Generates expanded role variations and similar titles using LLM
+    Returns the shared role cache, prewarmed from the last saved generated roles
     """
-    # Set up google gemini llm
-    llm = GoogleGenAI(
-        api_key=os.environ["GEMINI_API_KEY"],
-        model="gemini-2.5-pro",
-    )
+    global _role_cache
+    if _role_cache is None:
+        _role_cache = RoleCache()
+        _role_cache.prewarm(GENERATED_ROLES_FILE, model="gemini-2.5-pro")
+    return _role_cache
+
+
+async def generate_roles(
+    role_keywords: list, model: str = "gemini-2.5-pro", use_cache: bool = True
+) -> list:
+    """
+    Generates expanded role variations and similar titles using LLM.
+    Expansions are cached per normalized keyword set and model.
+    """
+    if use_cache:
+        cached_roles = get_role_cache().get(role_keywords, model)
+        if cached_roles:
+            print(f"Using {len(cached_roles)} cached role variations")
+            return cached_roles
+
+    # Reuse the shared google gemini llm client
+    llm = get_llm(model=model)
 
     # Create prompt for role expansion
     role_expansion_prompt = f"""
@@ -61,6 +83,8 @@ Example format:
                     unique_roles.append(role)
             
             print(f"Generated {len(unique_roles)} role variations from {len(role_keywords)} input roles")
+            if use_cache and unique_roles:
+                get_role_cache().put(role_keywords, model, unique_roles)
             return unique_roles
         else:
             print("Error: LLM did not return a list")
@@ -74,7 +98,7 @@ Example format:
         return role_keywords
 
 
-async def save_generated_roles(original_roles: list, expanded_roles: list, output_file: str = "data/generated_roles.json"):
+async def save_generated_roles(original_roles: list, expanded_roles: list, output_file: str = GENERATED_ROLES_FILE):
     """
     Save the generated roles for reference
     """
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Long-lived agent sessions for LeadSpot.
+
+A DeviceSession keeps the device tools connection, the droidrun config
+and the LLM client of one device alive for a whole campaign. Only the
+goal changes between tasks, so per-task setup is reduced to building
+the DroidAgent itself.
+"""
+from dataclasses import dataclass
+
+from droidrun import AdbTools, DroidAgent
+from droidrun.config_manager.config_manager import (
+    DroidrunConfig,
+    TracingConfig,
+    LoggingConfig,
+    AgentConfig,
+    DeviceConfig,
+)
+from agents.llm_pool import get_llm
+from agents.utils import event_text
+
+
+@dataclass
+class AbortedRun:
+    """
+    Result of a run stopped early by its event hook
+    """
+
+    reason: str
+    steps: int = None
+    success: bool = False
+    output: object = None
+
+
+class DeviceSession:
+    """
+    Reusable tools, configs and LLM for running many goals on one device.
+    """
+
+    def __init__(self, serial: str = None, llm=None, model: str = "gemini-2.5-pro"):
+        self.serial = serial
+        self.llm = llm or get_llm(model=model)
+        self.tools = AdbTools(serial=serial)
+        # One config per step budget, built on first use
+        self._configs = {}
+
+    @property
+    def label(self):
+        return self.serial or "default device"
+
+    def config(self, max_steps: int) -> DroidrunConfig:
+        """
+        Returns the shared config for a step budget
+        """
+        config = self._configs.get(max_steps)
+        if config is None:
+            config = DroidrunConfig(
+                agent=AgentConfig(reasoning=True, max_steps=max_steps),
+                device=DeviceConfig(serial=self.serial),
+                tracing=TracingConfig(enabled=False),
+                logging=LoggingConfig(debug=True, save_trajectory="action"),
+            )
+            self._configs[max_steps] = config
+        return config
+
+    def agent(self, goal: str, max_steps: int = 30, output_model=None) -> DroidAgent:
+        """
+        Builds an agent for a goal on top of the session's tools and config
+        """
+        kwargs = {"output_model": output_model} if output_model else {}
+        return DroidAgent(
+            goal=goal,
+            config=self.config(max_steps),
+            llms=self.llm,
+            tools=self.tools,
+            **kwargs,
+        )
+
+    async def run(self, goal: str, max_steps: int = 30, output_model=None, on_event=None):
+        """
+        Runs a goal on the session's device and returns the ResultEvent.
+
+        If given, ``on_event(event, text)`` sees every streamed event with
+        its flattened text and can stop the run by returning True, in which
+        case an AbortedRun is returned instead.
+        """
+        handler = self.agent(goal, max_steps, output_model).run()
+        if on_event is None:
+            return await handler
+
+        async for event in handler.stream_events():
+            if on_event(event, event_text(event)):
+                await handler.cancel_run()
+                steps = getattr(on_event, "steps", None)
+                return AbortedRun(reason=f"stopped early after {steps} steps", steps=steps)
+        return await handler
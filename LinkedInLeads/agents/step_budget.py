@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Adaptive step budgets and early exit for LeadSpot agent runs.
+
+Past runs are recorded per task type with their step count and the step
+at which the screen first showed progress (a connect dialog or a sent
+invitation). Budgets are set from the steps successful runs actually
+needed, and a run is aborted once it has gone K steps without progress,
+K being learned the same way.
+"""
+import math
+from collections import deque
+
+from agents.utils import event_text, iter_jsonl, open_jsonl_log
+
+# Droidrun events emitted once per executed action
+STEP_EVENTS = {"ExecutorResultEvent", "TaskExecutionResultEvent", "FastAgentToolCallEvent"}
+
+# Events showing what is on screen or what an action did. The agent's
+# reasoning, plans and goal text are left out: they mention connection
+# requests long before one is sent.
+EVIDENCE_EVENTS = {"RecordUIStateEvent", "ExecutorResultEvent", "ExecutorActionResultEvent"}
+
+# Screen or action result text showing the agent reached a matching person
+PROGRESS_HINTS = (
+    "invitation sent",
+    "send invitation",
+    "send without a note",
+    "add a note",
+)
+
+
+def progress_text(event) -> str:
+    """
+    Returns the UI state or successful action result carried by an
+    event, or "" for events that only carry the agent's own words
+    """
+    if type(event).__name__ not in EVIDENCE_EVENTS:
+        return ""
+    # Failed actions did not change anything on screen
+    if getattr(event, "outcome", True) is False or getattr(event, "success", True) is False:
+        return ""
+    return event_text(event)
+
+
+def percentile(values: list, fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+class StepBudget:
+    """
+    Learns step budgets and stall cutoffs per task type from a JSONL
+    history of past runs.
+    """
+
+    def __init__(
+        self,
+        history_file: str = "data/logs/step_history.jsonl",
+        window: int = 50,
+        min_samples: int = 5,
+        margin: float = 1.25,
+        min_steps: int = 10,
+        max_steps: int = 100,
+    ):
+        self.history_file = history_file
+        self.window = window
+        self.min_samples = min_samples
+        self.margin = margin
+        self.min_steps = min_steps
+        self.max_steps = max_steps
+        self._success_steps = {}
+        self._progress_steps = {}
+
+        for run in iter_jsonl(history_file):
+            self._add(run)
+
+    def budget(self, task_type: str, default: int) -> int:
+        """
+        Returns the step budget for a task type: the 90th percentile of
+        successful runs plus a margin, or ``default`` until enough runs
+        have been seen
+        """
+        steps = self._success_steps.get(task_type)
+        if not steps or len(steps) < self.min_samples:
+            return default
+        budget = math.ceil(percentile(steps, 0.9) * self.margin)
+        return max(self.min_steps, min(budget, self.max_steps))
+
+    def stall_steps(self, task_type: str, budget: int) -> int:
+        """
+        Returns how many steps a run may take without progress before it
+        is aborted; half the budget until enough runs have been seen
+        """
+        steps = self._progress_steps.get(task_type)
+        if not steps or len(steps) < self.min_samples:
+            return max(self.min_steps, budget // 2)
+        stall = math.ceil(percentile(steps, 0.9) * self.margin)
+        return max(self.min_steps, min(stall, budget))
+
+    def record(
+        self,
+        task_type: str,
+        success: bool,
+        steps: int,
+        progress_step: int = None,
+        aborted: bool = False,
+    ):
+        """
+        Records a finished run.
+
+        Args:
+            task_type: Kind of task, e.g. "single" or "batch:3"
+            success: Whether the run succeeded
+            steps: Steps the run took
+            progress_step: Step at which progress was first seen, if any
+            aborted: Whether the run was stopped early
+        """
+        run = {
+            "task_type": task_type,
+            "success": bool(success),
+            "steps": steps,
+            "progress_step": progress_step,
+            "aborted": aborted,
+        }
+        self._add(run)
+        open_jsonl_log(self.history_file).append(run)
+
+    def watcher(self, task_type: str, budget: int) -> "ProgressWatcher":
+        return ProgressWatcher(self.stall_steps(task_type, budget))
+
+    def _add(self, run):
+        task_type = run.get("task_type")
+        if not run.get("success") or not run.get("steps"):
+            return
+        self._success_steps.setdefault(task_type, deque(maxlen=self.window)).append(run["steps"])
+        if run.get("progress_step"):
+            self._progress_steps.setdefault(task_type, deque(maxlen=self.window)).append(
+                run["progress_step"]
+            )
+
+
+class ProgressWatcher:
+    """
+    Early-exit hook for one run: counts steps from the streamed events and
+    asks for an abort once ``stall_steps`` pass without progress.
+    """
+
+    def __init__(self, stall_steps: int):
+        self.stall_steps = stall_steps
+        self.steps = 0
+        self.progress_step = None
+
+    @property
+    def stalled(self) -> bool:
+        return self.progress_step is None and self.steps >= self.stall_steps
+
+    def __call__(self, event, text: str = "") -> bool:
+        """
+        Observes a streamed event, returning True if the run should stop.
+        Progress is read from the event's UI state or action result only,
+        not from ``text``, which includes the agent's reasoning.
+        """
+        if type(event).__name__ in STEP_EVENTS:
+            self.steps += 1
+        if self.progress_step is None:
+            lowered = progress_text(event).lower()
+            if any(hint in lowered for hint in PROGRESS_HINTS):
+                self.progress_step = max(self.steps, 1)
+        return self.stalled
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Yield-based scheduling of LeadSpot (company, role) tasks.
+
+Every agent run is recorded with its role title, the company's industry
+and size and the number of connections it sent. Tasks are scored by the
+smoothed historical hit rate of those features, run highest predicted
+yield first, and skipped when a well-tried role predicts too little.
+"""
+import os
+
+from agents.lead_index import normalize_role
+from agents.normalization import parse_follower_count
+from agents.utils import iter_jsonl, open_jsonl_log, parse_json_lenient
+
+SIZE_BUCKETS = [(1_000, "<1K"), (10_000, "1K-10K"), (100_000, "10K-100K")]
+
+
+def size_bucket(follower_count) -> str:
+    """
+    Buckets a company by LinkedIn follower count, as a proxy for its size
+    """
+    count = parse_follower_count(follower_count)
+    if count is None:
+        return "unknown"
+    for limit, label in SIZE_BUCKETS:
+        if count < limit:
+            return label
+    return "100K+"
+
+
+def task_features(company: dict, role: str) -> dict:
+    return {
+        "role": normalize_role(role),
+        "industry": normalize_role(company.get("industry")) or "unknown",
+        "size": size_bucket(company.get("follower_count", company.get("followers"))),
+    }
+
+
+class TaskScheduler:
+    """
+    Per-feature attempt and hit counts, persisted as an append-only JSONL
+    file of run outcomes.
+    """
+
+    def __init__(
+        self,
+        outcomes_file: str = "data/logs/task_outcomes.jsonl",
+        prior_weight: float = 5.0,
+        min_attempts: int = 5,
+    ):
+        self.outcomes_file = outcomes_file
+        self.prior_weight = prior_weight
+        self.min_attempts = min_attempts
+        self.attempts = 0
+        self.hits = 0
+        self._stats = {}
+
+        for outcome in iter_jsonl(outcomes_file):
+            self._add(outcome)
+
+    @property
+    def exists(self):
+        return os.path.exists(self.outcomes_file)
+
+    @property
+    def base_rate(self) -> float:
+        # Laplace smoothing keeps an empty history at 0.5
+        return (self.hits + 1) / (self.attempts + 2)
+
+    def record(self, company: dict, role: str, connections: int):
+        """
+        Records the outcome of one agent run for one role
+        """
+        outcome = dict(task_features(company, role), connections=int(connections or 0))
+        self._add(outcome)
+        open_jsonl_log(self.outcomes_file).append(outcome)
+
+    def build(self, connections):
+        """
+        Seeds the history from logged connections. Only successful runs
+        were logged before outcomes were recorded, so this is optimistic
+        until real outcomes accumulate.
+
+        Args:
+            connections: Iterable of connection log entries
+        """
+        for entry in connections:
+            company = entry.get("company") or {}
+            roles = entry.get("roles_searched") or [entry.get("role_searched", "")]
+            for role, count in role_hits(roles, entry.get("output")).items():
+                self.record(company, role, count)
+
+    def score(self, company: dict, role) -> float:
+        """
+        Predicts the probability that a run finds at least one connection.
+        A list of roles (one batched run) hits if any of its roles does.
+        """
+        if isinstance(role, (list, tuple)):
+            miss = 1.0
+            for single_role in role:
+                miss *= 1 - self.score(company, single_role)
+            return 1 - miss
+
+        base_rate = self.base_rate
+        score = base_rate
+        for feature, value in task_features(company, role).items():
+            attempts, hits = self._stats.get((feature, value), (0, 0))
+            rate = (hits + self.prior_weight * base_rate) / (attempts + self.prior_weight)
+            score *= rate / base_rate
+        return min(score, 1.0)
+
+    def prioritize(self, company: dict, roles: list, min_score: float = 0.0) -> tuple:
+        """
+        Orders a company's roles by predicted yield.
+
+        Roles scoring below ``min_score`` are dropped, but only once the
+        role has been tried ``min_attempts`` times, so new roles still get
+        explored.
+
+        Returns:
+            (roles to run, highest yield first; roles skipped)
+        """
+        kept, skipped = [], []
+        for role in roles:
+            attempts, _ = self._stats.get(("role", normalize_role(role)), (0, 0))
+            score = self.score(company, role)
+            if score < min_score and attempts >= self.min_attempts:
+                skipped.append(role)
+            else:
+                kept.append((score, role))
+        kept.sort(key=lambda item: item[0], reverse=True)
+        return [role for _, role in kept], skipped
+
+    def _add(self, outcome):
+        hit = int((outcome.get("connections") or 0) > 0)
+        self.attempts += 1
+        self.hits += hit
+        for feature in ("role", "industry", "size"):
+            key = (feature, outcome.get(feature) or "unknown")
+            attempts, hits = self._stats.get(key, (0, 0))
+            self._stats[key] = (attempts + 1, hits + hit)
+
+
+def role_hits(roles: list, output) -> dict:
+    """
+    Counts the people contacted per searched role in a connection output,
+    using roles_matched to attribute the people of a batched run
+    """
+    hits = {role: 0 for role in roles}
+    output = parse_json_lenient(output)
+    if not isinstance(output, dict):
+        return hits
+
+    people = output.get("people_contacted") or []
+    roles_matched = output.get("roles_matched") or []
+    by_name = {normalize_role(role): role for role in roles}
+    for i in range(len(people)):
+        matched = roles_matched[i] if i < len(roles_matched) else None
+        role = by_name.get(normalize_role(matched)) if matched else None
+        if role is None and len(roles) == 1:
+            role = roles[0]
+        if role is not None:
+            hits[role] += 1
+    if not people and len(roles) == 1:
+        hits[roles[0]] = int(output.get("connections_sent") or 0)
+    return hits
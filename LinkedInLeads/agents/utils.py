@@ -3,12 +3,16 @@
 Utility functions for LeadSpot.
 
 This module provides helper functions for data manipulation,
-particularly for converting between JSON and CSV formats
-and appending data to existing CSV files.
+particularly for converting between JSON and CSV formats,
+exporting rows to Parquet, appending data to existing CSV files and
+writing append-only JSONL logs.
 """
 import os
+import re
 import csv
 import json
+import time
+import atexit
 
 
 def append_to_csv(csv_file, data_dict, header_fields=None):
@@ -43,6 +47,146 @@ def append_to_csv(csv_file, data_dict, header_fields=None):
     return True
 
 
+class CsvSink:
+    """
+    Long-lived CSV writer.
+
+    Keeps the file handle and DictWriter open for its whole lifetime, writes
+    the header only when the file is new or empty, and buffers rows in memory
+    until ``max_rows`` rows are pending or ``max_delay`` seconds have passed
+    since the last flush. Remaining rows are flushed on close.
+    """
+
+    def __init__(self, csv_file, fieldnames, max_rows=50, max_delay=5.0):
+        self.csv_file = csv_file
+        self.fieldnames = list(fieldnames)
+        self.max_rows = max_rows
+        self.max_delay = max_delay
+        self._rows = []
+        self._last_flush = time.monotonic()
+
+        directory = os.path.dirname(csv_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(csv_file, "a", newline="")
+        self._writer = csv.DictWriter(
+            self._file, fieldnames=self.fieldnames, extrasaction="ignore"
+        )
+
+        # Appending to an existing file keeps its header
+        if self._file.tell() == 0:
+            self._writer.writeheader()
+            self._file.flush()
+
+    @property
+    def closed(self):
+        return self._file.closed
+
+    def write_row(self, data_dict):
+        """
+        Buffer a single row, flushing if a size or time threshold is reached.
+
+        Args:
+            data_dict: Dictionary of data keyed by fieldname
+        """
+        self._rows.append(data_dict)
+        if (
+            len(self._rows) >= self.max_rows
+            or time.monotonic() - self._last_flush >= self.max_delay
+        ):
+            self.flush()
+
+    def write_rows(self, rows):
+        for row in rows:
+            self.write_row(row)
+
+    def flush(self):
+        """Write all buffered rows to the file."""
+        if self._rows and not self._file.closed:
+            self._writer.writerows(self._rows)
+            self._file.flush()
+            self._rows.clear()
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def _map_row(item, field_mappings=None):
+    """Rename/select the fields of one item according to field_mappings."""
+    if not field_mappings:
+        return item
+    return {
+        out_field: item.get(in_field, "")
+        for in_field, out_field in field_mappings.items()
+    }
+
+
+def _ensure_parent(path):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+
+def _text_mixed_columns(rows):
+    """
+    Converts columns mixing strings with other values (e.g. follower
+    counts that could not be parsed) to strings, which Arrow requires
+    """
+    types = {}
+    for row in rows:
+        for field, value in row.items():
+            if value is not None:
+                types.setdefault(field, set()).add(isinstance(value, str))
+    mixed = {field for field, is_text in types.items() if len(is_text) > 1}
+    if not mixed:
+        return rows
+    return [
+        {
+            field: str(value) if field in mixed and value is not None else value
+            for field, value in row.items()
+        }
+        for row in rows
+    ]
+
+
+def rows_to_parquet(rows, parquet_file, field_mappings=None):
+    """
+    Write an iterable of dictionaries to a Parquet file.
+    Requires the optional pyarrow package.
+
+    Args:
+        rows: Iterable of dictionaries
+        parquet_file: Path to the Parquet file to create
+        field_mappings: Dictionary mapping input fields to output fields (optional)
+
+    Returns:
+        Number of rows written, or False if pyarrow is not installed
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        return False
+
+    _ensure_parent(parquet_file)
+
+    table = pa.Table.from_pylist(
+        _text_mixed_columns([_map_row(item, field_mappings) for item in rows])
+    )
+    pq.write_table(table, parquet_file)
+    return table.num_rows
+
+
 def json_to_csv(json_file, csv_file, field_mappings=None):
     """
     Convert a JSON file to a CSV file.
@@ -98,3 +242,330 @@ def json_to_csv(json_file, csv_file, field_mappings=None):
             writer.writerow(row)
 
     return True
+
+
+def extract_json_objects(text):
+    """
+    Extract every parseable JSON object embedded in free text.
+
+    Scans for balanced ``{...}`` spans (ignoring braces inside strings),
+    tolerates trailing commas and returns the innermost objects that parse,
+    so objects nested in a larger, unfinished array are still recovered.
+
+    Args:
+        text: Text that may contain JSON objects
+
+    Returns:
+        List of parsed dictionaries, in order of appearance
+    """
+    objects = []
+    stack = []
+    in_string = False
+    escaped = False
+
+    for index, char in enumerate(text or ""):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == "{":
+            stack.append((index, len(objects)))
+        elif char == "}" and stack:
+            start, inner_count = stack.pop()
+            candidate = re.sub(r",\s*([}\]])", r"\1", text[start : index + 1])
+            try:
+                parsed = json.loads(candidate)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(parsed, dict):
+                # Replace any objects already extracted from inside this one
+                del objects[inner_count:]
+                objects.append(parsed)
+
+    return objects
+
+
+def event_text(event) -> str:
+    """
+    Flattens all string fields of a workflow event into one text blob
+    """
+    try:
+        data = event.model_dump()
+    except AttributeError:
+        data = getattr(event, "__dict__", {})
+
+    strings = []
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, str):
+            strings.append(value)
+        elif isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+    return "\n".join(strings)
+
+
+def parse_json_lenient(text):
+    """
+    Parse JSON produced by an LLM, repairing common defects.
+
+    Handles markdown code fences, surrounding prose, unquoted keys,
+    trailing commas and output cut off mid-way (unterminated strings and
+    unclosed arrays/objects). For truncated output, the longest prefix
+    that can be closed into valid JSON is returned.
+
+    Args:
+        text: Raw LLM output
+
+    Returns:
+        The parsed value, or None if nothing could be recovered
+    """
+    if not isinstance(text, str):
+        return text
+
+    text = text.strip()
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+
+    # Strip markdown code fences
+    fence = re.search(r"```(?:json)?\s*(.*?)(?:```|$)", text, re.S)
+    if fence:
+        text = fence.group(1).strip()
+
+    # Skip any prose before the JSON value
+    starts = [index for index in (text.find("{"), text.find("[")) if index != -1]
+    if not starts:
+        return None
+    fragment = text[min(starts) :]
+
+    # Retry with bare keys such as {connections_sent: 0} quoted
+    quoted = re.sub(r'([{,]\s*)([A-Za-z_]\w*)(\s*:)', r'\1"\2"\3', fragment)
+
+    for variant in dict.fromkeys([fragment, quoted]):
+        for candidate in _closed_json_candidates(variant):
+            candidate = re.sub(r",\s*([}\]])", r"\1", candidate)
+            try:
+                return json.loads(candidate)
+            except json.JSONDecodeError:
+                continue
+    return None
+
+
+def _closed_json_candidates(fragment):
+    """
+    Yield ``fragment`` with unterminated strings and brackets closed, then
+    progressively shorter prefixes cut at top-level-safe commas.
+    """
+    stack = []
+    cuts = []
+    in_string = False
+    escaped = False
+    end = len(fragment)
+
+    for index, char in enumerate(fragment):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+        elif char in "}]":
+            if stack:
+                stack.pop()
+            if not stack:
+                # Ignore anything after the first complete value
+                end = index + 1
+                break
+        elif char == ",":
+            cuts.append((index, list(stack)))
+
+    if end < len(fragment):
+        yield fragment[:end]
+        return
+
+    yield fragment + ('"' if in_string else "") + "".join(reversed(stack))
+    for index, open_brackets in reversed(cuts):
+        yield fragment[:index] + "".join(reversed(open_brackets))
+
+
+class JsonlLog:
+    """
+    Append-only JSON Lines log.
+
+    Each entry is written as a single line, so appending is O(1) no matter
+    how large the log grows. Lines are flushed to the OS on every append and
+    fsync'd to disk in batches of ``fsync_every`` entries (and on close).
+    """
+
+    def __init__(self, path, fsync_every=10):
+        self.path = path
+        self.fsync_every = fsync_every
+        self._pending = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+
+    def append(self, entry):
+        """
+        Append a single JSON-serializable entry to the log.
+
+        Args:
+            entry: Dictionary (or other JSON-serializable value) to append
+        """
+        self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self._pending += 1
+        if self._pending >= self.fsync_every:
+            self.sync()
+
+    def sync(self):
+        """Force any appended entries onto disk."""
+        if self._file.closed or not self._pending:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._pending = 0
+
+    def close(self):
+        if self._file.closed:
+            return
+        self.sync()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def iter_jsonl(jsonl_file):
+    """
+    Stream entries from a JSONL file one at a time.
+
+    Blank lines and lines that fail to parse (e.g. a partially written last
+    line after a crash) are skipped.
+
+    Args:
+        jsonl_file: Path to the JSONL file
+    """
+    if not os.path.exists(jsonl_file):
+        return
+
+    with open(jsonl_file, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+def migrate_json_to_jsonl(json_file, jsonl_file):
+    """
+    One-shot migration of a JSON array file into a JSONL file.
+
+    The JSONL file is written next to its final location and renamed into
+    place, so an interrupted migration can simply be re-run. Does nothing if
+    the JSONL file already exists or the JSON file is missing.
+
+    Args:
+        json_file: Path to the existing JSON array file
+        jsonl_file: Path to the JSONL file to create
+
+    Returns:
+        Number of migrated entries, or 0 if nothing was migrated
+    """
+    if os.path.exists(jsonl_file) or not os.path.exists(json_file):
+        return 0
+
+    try:
+        with open(json_file, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+    except json.JSONDecodeError:
+        return 0
+
+    if not isinstance(entries, list):
+        entries = [entries]
+
+    directory = os.path.dirname(jsonl_file)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    temp_file = jsonl_file + ".tmp"
+    with open(temp_file, "w", encoding="utf-8") as f:
+        for entry in entries:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_file, jsonl_file)
+
+    return len(entries)
+
+
+# Long-lived writers shared by every caller in the process
+_open_jsonl_logs = {}
+_open_csv_sinks = {}
+
+
+def open_jsonl_log(jsonl_file, fsync_every=10):
+    """
+    Return the process-wide JsonlLog for ``jsonl_file``, opening it on first use.
+    Open logs are synced and closed automatically at interpreter exit.
+
+    Args:
+        jsonl_file: Path to the JSONL file
+        fsync_every: Number of appends between fsyncs
+    """
+    log = _open_jsonl_logs.get(jsonl_file)
+    if log is None or log._file.closed:
+        log = JsonlLog(jsonl_file, fsync_every=fsync_every)
+        _open_jsonl_logs[jsonl_file] = log
+    return log
+
+
+def open_csv_sink(csv_file, fieldnames, max_rows=50, max_delay=5.0):
+    """
+    Return the process-wide CsvSink for ``csv_file``, opening it on first use.
+    Open sinks are flushed and closed automatically at interpreter exit.
+
+    Args:
+        csv_file: Path to the CSV file
+        fieldnames: List of field names used as headers
+        max_rows: Number of buffered rows that triggers a flush
+        max_delay: Seconds since the last flush that trigger a flush
+    """
+    sink = _open_csv_sinks.get(csv_file)
+    if sink is None or sink.closed:
+        sink = CsvSink(csv_file, fieldnames, max_rows=max_rows, max_delay=max_delay)
+        _open_csv_sinks[csv_file] = sink
+    return sink
+
+
+@atexit.register
+def close_writers():
+    """Flush and close every log and sink opened through this module."""
+    for log in _open_jsonl_logs.values():
+        log.close()
+    _open_jsonl_logs.clear()
+    for sink in _open_csv_sinks.values():
+        sink.close()
+    _open_csv_sinks.clear()
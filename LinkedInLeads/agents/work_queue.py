@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Durable work queue for LeadSpot campaigns.
+
+Tracks every (companies_file, company, role) task in a local SQLite
+database so an interrupted or retried campaign only re-runs the tasks
+that have not completed yet.
+"""
+import os
+import sqlite3
+from datetime import datetime
+
+PENDING = "pending"
+IN_PROGRESS = "in_progress"
+DONE = "done"
+FAILED = "failed"
+# No longer part of the campaign, e.g. after the role keywords changed
+SKIPPED = "skipped"
+
+
+class WorkQueue:
+    """
+    SQLite-backed task states keyed by (companies_file, company_name, role).
+    """
+
+    def __init__(self, db_path: str = "data/work_queue.db"):
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.db_path = db_path
+        self._conn = sqlite3.connect(db_path)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS tasks (
+                companies_file TEXT NOT NULL,
+                company_name TEXT NOT NULL,
+                role TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                updated_at TEXT NOT NULL,
+                PRIMARY KEY (companies_file, company_name, role)
+            )
+            """
+        )
+        self._conn.commit()
+
+    def enqueue(self, companies_file: str, tasks: list):
+        """
+        Adds (company_name, role) tasks as pending, keeping the state of
+        tasks that are already known.
+
+        Args:
+            companies_file: Companies file the tasks were built from
+            tasks: List of (company_name, role) tuples
+        """
+        now = datetime.now().isoformat()
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO tasks "
+            "(companies_file, company_name, role, status, updated_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            [(companies_file, company, role, PENDING, now) for company, role in tasks],
+        )
+        self._conn.commit()
+
+    def recover(self, companies_file: str) -> int:
+        """
+        Resets tasks left in progress by a crashed run back to pending.
+
+        Returns:
+            Number of recovered tasks
+        """
+        cursor = self._conn.execute(
+            "UPDATE tasks SET status = ?, updated_at = ? "
+            "WHERE companies_file = ? AND status = ?",
+            (PENDING, datetime.now().isoformat(), companies_file, IN_PROGRESS),
+        )
+        self._conn.commit()
+        return cursor.rowcount
+
+    def status(self, companies_file: str, company_name: str, role: str):
+        row = self._conn.execute(
+            "SELECT status FROM tasks "
+            "WHERE companies_file = ? AND company_name = ? AND role = ?",
+            (companies_file, company_name, role),
+        ).fetchone()
+        return row[0] if row else None
+
+    def start(self, companies_file: str, company_name: str, role: str):
+        self._conn.execute(
+            "UPDATE tasks SET status = ?, attempts = attempts + 1, updated_at = ? "
+            "WHERE companies_file = ? AND company_name = ? AND role = ?",
+            (IN_PROGRESS, datetime.now().isoformat(), companies_file, company_name, role),
+        )
+        self._conn.commit()
+
+    def complete(self, companies_file: str, company_name: str, role: str):
+        self._set_status(companies_file, company_name, role, DONE)
+
+    def fail(self, companies_file: str, company_name: str, role: str, error: str = None):
+        self._set_status(companies_file, company_name, role, FAILED, error)
+
+    def retire(self, companies_file: str, keep: list) -> int:
+        """
+        Marks pending and failed tasks that are not in ``keep`` as skipped,
+        so tasks the current campaign no longer generates do not keep it
+        looking interrupted.
+
+        Args:
+            companies_file: Companies file the tasks were built from
+            keep: List of (company_name, role) tuples still to run
+
+        Returns:
+            Number of tasks skipped
+        """
+        keep = set(keep)
+        stale = [
+            (company, role)
+            for company, role in self._conn.execute(
+                "SELECT company_name, role FROM tasks "
+                "WHERE companies_file = ? AND status IN (?, ?)",
+                (companies_file, PENDING, FAILED),
+            )
+            if (company, role) not in keep
+        ]
+        now = datetime.now().isoformat()
+        self._conn.executemany(
+            "UPDATE tasks SET status = ?, last_error = ?, updated_at = ? "
+            "WHERE companies_file = ? AND company_name = ? AND role = ?",
+            [
+                (SKIPPED, "no longer part of the campaign", now, companies_file, company, role)
+                for company, role in stale
+            ],
+        )
+        self._conn.commit()
+        return len(stale)
+
+    def counts(self, companies_file: str) -> dict:
+        """
+        Returns the number of tasks in each state for a companies file
+        """
+        counts = {PENDING: 0, IN_PROGRESS: 0, DONE: 0, FAILED: 0, SKIPPED: 0}
+        for status, count in self._conn.execute(
+            "SELECT status, COUNT(*) FROM tasks WHERE companies_file = ? GROUP BY status",
+            (companies_file,),
+        ):
+            counts[status] = count
+        return counts
+
+    def interrupted_campaigns(self) -> list:
+        """
+        Returns companies files that still have pending or in-progress tasks,
+        most recently updated first
+        """
+        return [
+            row[0]
+            for row in self._conn.execute(
+                "SELECT companies_file, MAX(updated_at) AS last_update FROM tasks "
+                "WHERE status IN (?, ?) GROUP BY companies_file "
+                "ORDER BY last_update DESC",
+                (PENDING, IN_PROGRESS),
+            )
+        ]
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _set_status(self, companies_file, company_name, role, status, error=None):
+        self._conn.execute(
+            "UPDATE tasks SET status = ?, last_error = ?, updated_at = ? "
+            "WHERE companies_file = ? AND company_name = ? AND role = ?",
+            (status, error, datetime.now().isoformat(), companies_file, company_name, role),
+        )
+        self._conn.commit()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmarks per-task agent setup overhead in the lead connector.
+
+Compares building a fresh DroidrunConfig, device tools and DroidAgent for
+every (company, role) task (the previous behaviour) against reusing a
+DeviceSession and only swapping the goal. Agents are constructed but never
+run, so the numbers isolate setup cost.
+
+Run from the LinkedInLeads directory with a device connected:
+    python -m benchmarks.session_setup --tasks 50
+"""
+import argparse
+import time
+from statistics import mean, median
+
+from droidrun import AdbTools, DroidAgent
+from droidrun.config_manager.config_manager import (
+    DroidrunConfig,
+    TracingConfig,
+    LoggingConfig,
+    AgentConfig,
+    DeviceConfig,
+)
+from agents.llm_pool import get_llm
+from agents.prompts import prompts
+from agents.session import DeviceSession
+
+TEST_CONFIG = {
+    "goal_intent": "Book demo calls",
+    "about_yourself": "With Droidrun you can automate any mobile app.",
+}
+
+
+def task_goals(count: int) -> list:
+    return [
+        prompts.LEAD_CONNECTOR_GOAL(
+            company_name=f"Company {i}",
+            role_title="Marketing Director",
+            goal_intent=TEST_CONFIG["goal_intent"],
+            about_yourself=TEST_CONFIG["about_yourself"],
+            user_config=TEST_CONFIG,
+        )
+        for i in range(count)
+    ]
+
+
+def setup_per_task(goal: str, serial: str, llm):
+    config = DroidrunConfig(
+        agent=AgentConfig(reasoning=True, max_steps=30),
+        device=DeviceConfig(serial=serial),
+        tracing=TracingConfig(enabled=False),
+        logging=LoggingConfig(debug=True, save_trajectory="action"),
+    )
+    return DroidAgent(
+        goal=goal, config=config, llms=llm, tools=AdbTools(serial=serial)
+    )
+
+
+def time_calls(function, goals: list) -> list:
+    timings = []
+    for goal in goals:
+        start = time.perf_counter()
+        function(goal)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(name: str, timings: list):
+    print(
+        f"{name:<12} mean {mean(timings):8.2f} ms   median {median(timings):8.2f} ms   "
+        f"total {sum(timings):9.2f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tasks", type=int, default=50)
+    parser.add_argument("--serial", default=None)
+    args = parser.parse_args()
+
+    llm = get_llm(model="gemini-2.5-pro")
+    goals = task_goals(args.tasks)
+
+    before = time_calls(lambda goal: setup_per_task(goal, args.serial, llm), goals)
+
+    session_start = time.perf_counter()
+    session = DeviceSession(args.serial, llm=llm)
+    session_cost = (time.perf_counter() - session_start) * 1000
+    after = time_calls(lambda goal: session.agent(goal, max_steps=30), goals)
+
+    print(f"Per-task setup over {args.tasks} tasks")
+    report("before", before)
+    report("after", after)
+    print(f"{'session':<12} one-off {session_cost:.2f} ms")
+    print(f"Speedup: {mean(before) / max(mean(after), 1e-9):.1f}x per task")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,40 @@
 #!/usr/bin/env python3
+import argparse
 import asyncio
 import os
 import json
+import sys
+from datetime import datetime
 from colorama import init, Fore, Style
-from agents.company_scraper import scrape_companies
+from agents.company_scraper import scrape_companies, companies_file_paths
 from agents.role_generator import generate_roles
 from agents.lead_connector import connect_with_leads
+from agents.device_pool import list_devices
+from agents.metrics import load_metrics
+from agents.work_queue import WorkQueue
 
 # Initialize colorama for cross-platform colored terminal text
 init(autoreset=True)
 
+# Companies buffered between the scraper and the lead connector
+PIPELINE_QUEUE_SIZE = 10
+
+USER_CONFIG_FILE = "data/user_config.json"
+REQUIRED_CONFIG_KEYS = [
+    "target_audience",
+    "industry",
+    "region",
+    "company_size",
+    "role_keywords",
+    "goal_intent",
+    "about_yourself",
+]
+
+# Headless exit codes
+EXIT_OK = 0
+EXIT_CYCLE_FAILED = 1
+EXIT_BAD_CONFIG = 2
+
 
 def print_banner():
     banner = f"""
@@ -105,143 +130,461 @@ def get_user_input():
     }
 
 
-async def run_lead_generation_cycle(user_config: dict):
-    cycle_count = 1
-    max_retries = 3
+def find_interrupted_campaign():
+    """Returns the most recent companies file with unfinished searches, if any"""
+    with WorkQueue() as queue:
+        for companies_file in queue.interrupted_campaigns():
+            if os.path.exists(companies_file):
+                return companies_file
+    return None
 
-    while True:
-        print(
-            f"\n{Fore.MAGENTA}{Style.BRIGHT}🔄 Starting Lead Generation Cycle #{cycle_count}{Style.RESET_ALL}"
-        )
-        print(f"{Fore.MAGENTA}{'='*60}{Style.RESET_ALL}")
 
-        # Step 1: Scrape companies matching criteria
-        companies_file = None
-        for attempt in range(max_retries):
-            try:
-                print_agent_status("COMPANY_SCRAPER", Fore.CYAN)
-                if attempt > 0:
-                    print(
-                        f"{Fore.YELLOW}🔄 Retry attempt {attempt + 1}/{max_retries}{Style.RESET_ALL}"
-                    )
-
-                companies_file = await scrape_companies(user_config)
-
-                if companies_file and os.path.exists(companies_file):
-                    print(
-                        f"{Fore.GREEN}✅ Companies found and saved to: {companies_file}{Style.RESET_ALL}"
-                    )
-                    break
-                else:
-                    print(
-                        f"{Fore.RED}❌ Failed to find companies. Attempt {attempt + 1}/{max_retries}{Style.RESET_ALL}"
-                    )
-
-            except Exception as e:
+async def generate_role_variations(user_config: dict, max_retries: int) -> bool:
+    """Expands the role keywords into user_config["expanded_roles"]"""
+    for attempt in range(max_retries):
+        try:
+            print_agent_status("ROLE_GENERATOR", Fore.BLUE)
+            if attempt > 0:
                 print(
-                    f"{Fore.RED}❌ Error in COMPANY_SCRAPER (attempt {attempt + 1}/{max_retries}): {str(e)}{Style.RESET_ALL}"
+                    f"{Fore.YELLOW}🔄 Retry attempt {attempt + 1}/{max_retries}{Style.RESET_ALL}"
                 )
 
-        if not companies_file or not os.path.exists(companies_file):
+            expanded_roles = await generate_roles(user_config["role_keywords"])
+            user_config["expanded_roles"] = expanded_roles
+
+            print(
+                f"{Fore.GREEN}✅ Role variations generated: {', '.join(expanded_roles)}{Style.RESET_ALL}"
+            )
+            return True
+
+        except Exception as e:
             print(
-                f"{Fore.RED}❌ Failed to find companies. Skipping to next cycle...{Style.RESET_ALL}"
+                f"{Fore.RED}❌ Error in ROLE_GENERATOR (attempt {attempt + 1}/{max_retries}): {str(e)}{Style.RESET_ALL}"
             )
-            cycle_count += 1
-            continue
-
-        # Step 2: Generate role variations
-        roles_generated = False
-        for attempt in range(max_retries):
-            try:
-                print_agent_status("ROLE_GENERATOR", Fore.BLUE)
-                if attempt > 0:
-                    print(
-                        f"{Fore.YELLOW}🔄 Retry attempt {attempt + 1}/{max_retries}{Style.RESET_ALL}"
-                    )
-
-                expanded_roles = await generate_roles(user_config["role_keywords"])
-                user_config["expanded_roles"] = expanded_roles
-                roles_generated = True
+    return False
 
+
+async def scrape_with_retries(user_config: dict, max_retries: int, first_attempt: int = 0):
+    """Scrapes companies, returning the companies file or None"""
+    for attempt in range(first_attempt, max_retries):
+        try:
+            print_agent_status("COMPANY_SCRAPER", Fore.CYAN)
+            if attempt > 0:
                 print(
-                    f"{Fore.GREEN}✅ Role variations generated: {', '.join(expanded_roles)}{Style.RESET_ALL}"
+                    f"{Fore.YELLOW}🔄 Retry attempt {attempt + 1}/{max_retries}{Style.RESET_ALL}"
                 )
-                break
 
-            except Exception as e:
+            companies_file = await scrape_companies(user_config)
+
+            if companies_file and os.path.exists(companies_file):
+                print(
+                    f"{Fore.GREEN}✅ Companies found and saved to: {companies_file}{Style.RESET_ALL}"
+                )
+                return companies_file
+            else:
                 print(
-                    f"{Fore.RED}❌ Error in ROLE_GENERATOR (attempt {attempt + 1}/{max_retries}): {str(e)}{Style.RESET_ALL}"
+                    f"{Fore.RED}❌ Failed to find companies. Attempt {attempt + 1}/{max_retries}{Style.RESET_ALL}"
                 )
 
-        # Step 3: Connect with leads
-        connection_success = False
-        for attempt in range(max_retries):
-            try:
-                print_agent_status("LEAD_CONNECTOR", Fore.GREEN)
-                if attempt > 0:
-                    print(
-                        f"{Fore.YELLOW}🔄 Retry attempt {attempt + 1}/{max_retries}{Style.RESET_ALL}"
-                    )
-
-                connection_success = await connect_with_leads(
-                    companies_file, user_config
+        except Exception as e:
+            print(
+                f"{Fore.RED}❌ Error in COMPANY_SCRAPER (attempt {attempt + 1}/{max_retries}): {str(e)}{Style.RESET_ALL}"
+            )
+    return None
+
+
+async def connect_with_retries(
+    companies_file: str, user_config: dict, max_retries: int, first_attempt: int = 0
+) -> bool:
+    """Connects with leads from a companies file, re-running only failed searches"""
+    for attempt in range(first_attempt, max_retries):
+        try:
+            print_agent_status("LEAD_CONNECTOR", Fore.GREEN)
+            if attempt > 0:
+                print(
+                    f"{Fore.YELLOW}🔄 Retry attempt {attempt + 1}/{max_retries}{Style.RESET_ALL}"
                 )
 
-                if connection_success:
-                    print(
-                        f"{Fore.GREEN}✅ Successfully connected with leads!{Style.RESET_ALL}"
-                    )
-                    break
-                else:
-                    print(
-                        f"{Fore.RED}❌ Failed to connect with leads. Attempt {attempt + 1}/{max_retries}{Style.RESET_ALL}"
-                    )
-
-            except Exception as e:
+            connection_success = await connect_with_leads(
+                companies_file,
+                user_config,
+                batch_roles=user_config.get("batch_roles", False),
+            )
+
+            if connection_success:
                 print(
-                    f"{Fore.RED}❌ Error in LEAD_CONNECTOR (attempt {attempt + 1}/{max_retries}): {str(e)}{Style.RESET_ALL}"
+                    f"{Fore.GREEN}✅ Successfully connected with leads!{Style.RESET_ALL}"
                 )
+                return True
+            else:
+                print(
+                    f"{Fore.RED}❌ Failed to connect with leads. Attempt {attempt + 1}/{max_retries}{Style.RESET_ALL}"
+                )
+
+        except Exception as e:
+            print(
+                f"{Fore.RED}❌ Error in LEAD_CONNECTOR (attempt {attempt + 1}/{max_retries}): {str(e)}{Style.RESET_ALL}"
+            )
+    return False
+
+
+async def run_pipelined_cycle(user_config: dict, max_retries: int, devices: list):
+    """
+    Runs the scraper, role generator and lead connector as one pipeline:
+    role generation runs while the scraper browses, and connection tasks
+    start as soon as companies arrive on a bounded queue. The scraper
+    gets the first device to itself; the connector uses the others.
+
+    The campaign is keyed on the companies JSONL file, which the scraper
+    appends to as companies arrive, so a crash mid-pipeline leaves pending
+    searches that the next cycle can resume from it.
+
+    Returns (campaign_file, roles_generated, connection_success)
+    """
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    campaign_file = companies_file_paths(user_config, timestamp=timestamp)[2]
+    company_queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+
+    print_agent_status("COMPANY_SCRAPER", Fore.CYAN)
+    scrape_task = asyncio.create_task(
+        scrape_companies(
+            user_config,
+            company_queue=company_queue,
+            timestamp=timestamp,
+            serial=devices[0],
+        )
+    )
+
+    roles_generated = await generate_role_variations(user_config, max_retries)
 
-        # Cycle completion summary
+    print_agent_status("LEAD_CONNECTOR", Fore.GREEN)
+    try:
+        connection_success = await connect_with_leads(
+            campaign_file,
+            user_config,
+            devices=devices[1:],
+            batch_roles=user_config.get("batch_roles", False),
+            company_queue=company_queue,
+        )
+    except Exception as e:
+        print(
+            f"{Fore.RED}❌ Error in LEAD_CONNECTOR (attempt 1/{max_retries}): {str(e)}{Style.RESET_ALL}"
+        )
+        connection_success = False
+        # Keep draining the queue so the scraper can finish and save its companies
+        while not scrape_task.done():
+            if company_queue.empty():
+                await asyncio.sleep(0.5)
+            else:
+                company_queue.get_nowait()
+
+    try:
+        companies_file = await scrape_task
+    except Exception as e:
         print(
-            f"\n{Fore.MAGENTA}{Style.BRIGHT}📊 Cycle #{cycle_count} Summary:{Style.RESET_ALL}"
+            f"{Fore.RED}❌ Error in COMPANY_SCRAPER (attempt 1/{max_retries}): {str(e)}{Style.RESET_ALL}"
         )
+        companies_file = None
+
+    if companies_file and os.path.exists(companies_file):
         print(
-            f"{Fore.CYAN}   Company Scraping: {'✅ Success' if companies_file else '❌ Failed'}{Style.RESET_ALL}"
+            f"{Fore.GREEN}✅ Companies found and saved to: {companies_file}{Style.RESET_ALL}"
         )
+    else:
         print(
-            f"{Fore.BLUE}   Role Generation: {'✅ Success' if roles_generated else '❌ Failed'}{Style.RESET_ALL}"
+            f"{Fore.RED}❌ Failed to find companies. Attempt 1/{max_retries}{Style.RESET_ALL}"
         )
+        return None, roles_generated, connection_success
+
+    # Retries continue the same campaign
+    return campaign_file, roles_generated, connection_success
+
+
+async def run_cycle(user_config: dict, cycle_count: int, max_retries: int) -> dict:
+    """Runs one lead generation cycle and returns its summary"""
+    print(
+        f"\n{Fore.MAGENTA}{Style.BRIGHT}🔄 Starting Lead Generation Cycle #{cycle_count}{Style.RESET_ALL}"
+    )
+    print(f"{Fore.MAGENTA}{'='*60}{Style.RESET_ALL}")
+    started_at = datetime.now().isoformat(timespec="seconds")
+
+    # Resume an interrupted campaign instead of scraping again
+    companies_file = find_interrupted_campaign()
+    resumed = bool(companies_file)
+    if resumed:
         print(
-            f"{Fore.GREEN}   Lead Connections: {'✅ Success' if connection_success else '❌ Failed'}{Style.RESET_ALL}"
+            f"{Fore.YELLOW}♻️ Resuming interrupted campaign: {companies_file}{Style.RESET_ALL}"
+        )
+        roles_generated = await generate_role_variations(user_config, max_retries)
+        connection_success = await connect_with_retries(
+            companies_file, user_config, max_retries
         )
+    else:
+        devices = await list_devices()
+        if len(devices) > 1:
+            # First attempt runs all stages as a pipeline
+            (
+                companies_file,
+                roles_generated,
+                connection_success,
+            ) = await run_pipelined_cycle(user_config, max_retries, devices)
+
+            # Retries fall back to running the stages one after another
+            if not companies_file:
+                companies_file = await scrape_with_retries(
+                    user_config, max_retries, first_attempt=1
+                )
+            if companies_file and not connection_success:
+                connection_success = await connect_with_retries(
+                    companies_file, user_config, max_retries, first_attempt=1
+                )
+        else:
+            # A single phone cannot scrape and connect at the same time
+            companies_file = await scrape_with_retries(user_config, max_retries)
+            roles_generated = await generate_role_variations(user_config, max_retries)
+            connection_success = False
+            if companies_file:
+                connection_success = await connect_with_retries(
+                    companies_file, user_config, max_retries
+                )
 
-        # Ask user if they want to continue
+    task_metrics = load_metrics(since=started_at)
+    summary = {
+        "cycle": cycle_count,
+        "started_at": started_at,
+        "finished_at": datetime.now().isoformat(timespec="seconds"),
+        "resumed": resumed,
+        "companies_file": companies_file,
+        "companies_scraped": bool(companies_file),
+        "roles_generated": roles_generated,
+        "connection_success": bool(connection_success),
+        "searches": len(task_metrics),
+        "connections_sent": sum(record.get("connections") or 0 for record in task_metrics),
+    }
+
+    if not companies_file:
         print(
-            f"\n{Fore.BLUE}🤔 Do you want to run another cycle? (y/n): {Style.RESET_ALL}",
-            end="",
+            f"{Fore.RED}❌ Failed to find companies. Skipping to next cycle...{Style.RESET_ALL}"
         )
-        user_input = input().strip().lower()
+        return summary
+
+    # Cycle completion summary
+    print(
+        f"\n{Fore.MAGENTA}{Style.BRIGHT}📊 Cycle #{cycle_count} Summary:{Style.RESET_ALL}"
+    )
+    print(
+        f"{Fore.CYAN}   Company Scraping: {'✅ Success' if companies_file else '❌ Failed'}{Style.RESET_ALL}"
+    )
+    print(
+        f"{Fore.BLUE}   Role Generation: {'✅ Success' if roles_generated else '❌ Failed'}{Style.RESET_ALL}"
+    )
+    print(
+        f"{Fore.GREEN}   Lead Connections: {'✅ Success' if connection_success else '❌ Failed'}{Style.RESET_ALL}"
+    )
+    return summary
+
 
-        if user_input not in ["y", "yes", ""]:
+def ask_another_cycle() -> bool:
+    print(
+        f"\n{Fore.BLUE}🤔 Do you want to run another cycle? (y/n): {Style.RESET_ALL}",
+        end="",
+    )
+    return input().strip().lower() in ["y", "yes", ""]
+
+
+async def run_lead_generation_cycle(
+    user_config: dict,
+    cycles: int = None,
+    max_connections: int = None,
+    max_failed_cycles: int = None,
+    stop_file: str = None,
+    should_continue=ask_another_cycle,
+    max_retries: int = 3,
+) -> list:
+    """
+    Runs lead generation cycles until a stop condition is met:
+    ``cycles`` cycles have run, ``max_connections`` connections were sent,
+    ``max_failed_cycles`` cycles failed in a row, ``stop_file`` exists, or
+    ``should_continue()`` returns False (pass None to never ask).
+
+    Returns the summaries of all cycles run
+    """
+    summaries = []
+    failed_in_row = 0
+    cycle_count = 1
+
+    while True:
+        summary = await run_cycle(user_config, cycle_count, max_retries)
+        summaries.append(summary)
+        failed_in_row = 0 if summary["connection_success"] else failed_in_row + 1
+        connections_sent = sum(cycle["connections_sent"] for cycle in summaries)
+
+        stop_reason = None
+        if cycles is not None and cycle_count >= cycles:
+            stop_reason = "cycles"
+        elif max_connections is not None and connections_sent >= max_connections:
+            stop_reason = "max_connections"
+        elif max_failed_cycles is not None and failed_in_row >= max_failed_cycles:
+            stop_reason = "max_failed_cycles"
+        elif stop_file and os.path.exists(stop_file):
+            stop_reason = "stop_file"
+        elif should_continue is not None and summary["companies_scraped"] and not should_continue():
+            stop_reason = "user"
+
+        if stop_reason:
+            summary["stop_reason"] = stop_reason
             print(
                 f"{Fore.CYAN}👋 LeadSpot session ended. Happy networking!{Style.RESET_ALL}"
             )
-            break
+            return summaries
 
         cycle_count += 1
 
 
-async def main():
+def load_user_config(config_file: str = USER_CONFIG_FILE) -> dict:
+    if not os.path.exists(config_file):
+        return {}
+    with open(config_file, "r") as f:
+        return json.load(f)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="LeadSpot LinkedIn lead generation")
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="Run without prompts, reading the config from --config and the flags below",
+    )
+    parser.add_argument("--config", default=USER_CONFIG_FILE, help="User config JSON file")
+    parser.add_argument("--target-audience")
+    parser.add_argument("--industry")
+    parser.add_argument("--region")
+    parser.add_argument("--company-size")
+    parser.add_argument("--roles", help="Comma separated role keywords")
+    parser.add_argument("--goal-intent")
+    parser.add_argument("--about-yourself")
+    parser.add_argument("--batch-roles", action="store_true", default=None)
+    parser.add_argument("--cycles", type=int, help="Number of cycles to run (headless default: 1)")
+    parser.add_argument("--max-connections", type=int, help="Stop once this many connections were sent")
+    parser.add_argument("--max-failed-cycles", type=int, help="Stop after this many failed cycles in a row")
+    parser.add_argument("--stop-file", help="Stop after the current cycle once this file exists")
+    parser.add_argument("--max-retries", type=int, default=3)
+    parser.add_argument("--summary-file", help="Also write the JSON run summary to this file")
+    return parser.parse_args(argv)
+
+
+def config_from_args(args) -> dict:
+    """Builds the user config from the config file overridden by CLI flags"""
+    user_config = load_user_config(args.config)
+    overrides = {
+        "target_audience": args.target_audience,
+        "industry": args.industry,
+        "region": args.region,
+        "company_size": args.company_size,
+        "goal_intent": args.goal_intent,
+        "about_yourself": args.about_yourself,
+        "batch_roles": args.batch_roles,
+    }
+    if args.roles:
+        overrides["role_keywords"] = [role.strip() for role in args.roles.split(",") if role.strip()]
+    user_config.update({key: value for key, value in overrides.items() if value is not None})
+    return user_config
+
+
+async def run_headless(args) -> int:
+    """Runs unattended and prints a JSON summary, returning the exit code"""
+    try:
+        user_config = config_from_args(args)
+    except (OSError, json.JSONDecodeError) as e:
+        user_config, config_error = {}, f"Could not read {args.config}: {e}"
+    else:
+        missing = [key for key in REQUIRED_CONFIG_KEYS if not user_config.get(key)]
+        config_error = f"Missing config values: {', '.join(missing)}" if missing else None
+
+    if config_error:
+        print(f"{Fore.RED}❌ {config_error}{Style.RESET_ALL}", file=sys.stderr)
+        result = {"status": "bad_config", "error": config_error, "cycles": []}
+        exit_code = EXIT_BAD_CONFIG
+    else:
+        summaries = await run_lead_generation_cycle(
+            user_config,
+            cycles=args.cycles if args.cycles is not None else 1,
+            max_connections=args.max_connections,
+            max_failed_cycles=args.max_failed_cycles,
+            stop_file=args.stop_file,
+            should_continue=None,
+            max_retries=args.max_retries,
+        )
+        failed = sum(1 for summary in summaries if not summary["connection_success"])
+        exit_code = EXIT_CYCLE_FAILED if failed else EXIT_OK
+        result = {
+            "status": "failed" if failed else "ok",
+            "stop_reason": summaries[-1].get("stop_reason"),
+            "cycles_run": len(summaries),
+            "cycles_failed": failed,
+            "connections_sent": sum(summary["connections_sent"] for summary in summaries),
+            "cycles": summaries,
+        }
+
+    result["exit_code"] = exit_code
+    if args.summary_file:
+        directory = os.path.dirname(args.summary_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(args.summary_file, "w") as f:
+            json.dump(result, f, indent=4)
+    print(json.dumps(result))
+    return exit_code
+
+
+async def main(argv=None):
     """Main function"""
+    args = parse_args(argv)
+    if args.headless:
+        return await run_headless(args)
+
     print_banner()
     input()  # Wait for user to press Enter
 
     print(f"{Fore.GREEN}{Style.BRIGHT}🚀 LeadSpot is starting up...{Style.RESET_ALL}")
 
-    # Get user configuration
-    user_config = get_user_input()
+    while True:
+        # Get user configuration
+        user_config = get_user_input()
+        if confirm_settings(user_config):
+            break
+        print(f"{Fore.YELLOW}Let's try again with new settings.{Style.RESET_ALL}")
+
+    # Keep settings that are only set in the saved config file, such as
+    # batch_roles, min_task_score or linkedin_account; expanded roles are
+    # regenerated from the new keywords
+    saved_config = load_user_config(args.config)
+    for key, value in saved_config.items():
+        if key != "expanded_roles":
+            user_config.setdefault(key, value)
+
+    # Save user config for reference
+    os.makedirs(os.path.dirname(args.config) or ".", exist_ok=True)
+    with open(args.config, "w") as f:
+        json.dump(user_config, f, indent=4)
+
+    print(
+        f"{Fore.GREEN}✅ Configuration saved. Starting lead generation process...{Style.RESET_ALL}"
+    )
+
+    await run_lead_generation_cycle(
+        user_config,
+        cycles=args.cycles,
+        max_connections=args.max_connections,
+        max_failed_cycles=args.max_failed_cycles,
+        stop_file=args.stop_file,
+        max_retries=args.max_retries,
+    )
+    return EXIT_OK
+
 
+def confirm_settings(user_config: dict) -> bool:
+    """Shows the collected settings and asks the user to confirm them"""
     # Display confirmation of settings
     print(
         f"\n{Fore.CYAN}{Style.BRIGHT}📝 Your Lead Generation Settings:{Style.RESET_ALL}"
@@ -270,23 +613,8 @@ async def main():
 
     # Confirm settings
     print(f"\n{Fore.BLUE}Are these settings correct? (y/n): {Style.RESET_ALL}", end="")
-    confirm = input().strip().lower()
-
-    if confirm not in ["y", "yes", ""]:
-        print(f"{Fore.YELLOW}Let's try again with new settings.{Style.RESET_ALL}")
-        return await main()  # Restart the process
-
-    # Save user config for reference
-    os.makedirs("data", exist_ok=True)
-    with open("data/user_config.json", "w") as f:
-        json.dump(user_config, f, indent=4)
-
-    print(
-        f"{Fore.GREEN}✅ Configuration saved. Starting lead generation process...{Style.RESET_ALL}"
-    )
-
-    await run_lead_generation_cycle(user_config)
+    return input().strip().lower() in ["y", "yes", ""]
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    sys.exit(asyncio.run(main()))
@@ -1,6 +1,5 @@
 #!/usr/bin/env python3
-import os
-from llama_index.llms.google_genai import GoogleGenAI
+from agents.llm_pool import get_llm
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -8,10 +7,7 @@ load_dotenv()
 
 class ContentGenerator:
     def __init__(self):
-        self.llm = GoogleGenAI(
-            api_key=os.getenv("GEMINI_API_KEY"),
-            model="gemini-2.5-flash",
-        )
+        self.llm = get_llm(model="gemini-2.5-flash")
 
     async def generate_twitter_post(
         self, trending_topic: str, description: str = "", category: str = ""
@@ -8,21 +8,17 @@ from droidrun.config_manager.config_manager import (
     LoggingConfig,
     AgentConfig,
 )
-from llama_index.llms.google_genai import GoogleGenAI
+from agents.llm_pool import get_llm
 from agents.prompts.prompts import OPEN_CHROME_GOOGLE_TRENDS_GOAL
 from dotenv import load_dotenv
-import os
 
 load_dotenv()
 
 
 async def find_trend():
     """Find trending topics using Chrome and Google Trends"""
-    # Use default configuration with built-in LLM profiles
-    llm = GoogleGenAI(
-        api_key=os.getenv("GEMINI_API_KEY"),
-        model="gemini-2.5-pro",
-    )
+    # Reuse the shared LLM client
+    llm = get_llm(model="gemini-2.5-pro")
     config = DroidrunConfig(
         agent=AgentConfig(reasoning=True),
         tracing=TracingConfig(enabled=False),
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Process-wide pool of LLM clients.
+
+Building a GoogleGenAI client sets up authentication and a new HTTP
+session, so agents share one client per (model, api key) instead of
+constructing one on every call. Reused clients keep their underlying
+HTTP connections alive between requests.
+"""
+import os
+import threading
+from llama_index.llms.google_genai import GoogleGenAI
+from dotenv import load_dotenv
+
+load_dotenv()
+
+_clients = {}
+_lock = threading.Lock()
+
+
+def get_llm(model: str = "gemini-2.5-flash", api_key: str = None) -> GoogleGenAI:
+    """
+    Returns the shared GoogleGenAI client for a model, creating it on first use
+
+    Args:
+        model: Gemini model name
+        api_key: API key to use (defaults to GEMINI_API_KEY)
+    """
+    api_key = api_key or os.getenv("GEMINI_API_KEY")
+    key = (model, api_key)
+
+    client = _clients.get(key)
+    if client is None:
+        with _lock:
+            client = _clients.get(key)
+            if client is None:
+                client = GoogleGenAI(api_key=api_key, model=model)
+                _clients[key] = client
+    return client
+
+
+def clear_llms():
+    """Drops all pooled clients so the next call builds fresh ones."""
+    with _lock:
+        _clients.clear()
@@ -8,21 +8,17 @@ from droidrun.config_manager.config_manager import (
     LoggingConfig,
     AgentConfig,
 )
-from llama_index.llms.google_genai import GoogleGenAI
+from agents.llm_pool import get_llm
 from agents.prompts.prompts import OPEN_TWITTER_CREATE_POST_GOAL
 from dotenv import load_dotenv
-import os
 
 load_dotenv()
 
 
 async def post_to_twitter(post_content: str, has_image: bool = True):
     """Post content to Twitter/X with optional image"""
-    # Use default configuration with built-in LLM profiles
-    llm = GoogleGenAI(
-        api_key=os.getenv("GEMINI_API_KEY"),
-        model="gemini-2.5-flash",
-    )
+    # Reuse the shared LLM client
+    llm = get_llm(model="gemini-2.5-flash")
     config = DroidrunConfig(
         agent=AgentConfig(reasoning=True),
         tracing=TracingConfig(enabled=False),